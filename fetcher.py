@@ -15,10 +15,10 @@ from argparse import Namespace
 # Source modules
 from source.logging_modules import CustomLogger
 from source.database_modules import DatabaseConnection, DatabaseManager
-from source.hash_modules import HashCalculator
+from source.hash_modules import HashCalculator, FileHashCache
 from source.fingerprint_modules import VideoFingerprinter
 from source.yolo_modules import YoloProvider, get_yolo_provider
-from source.fetcher_modules import InstagramFetcher, RateController
+from source.fetcher_modules import InstagramFetcher, RateController, DOWNLOAD_WORKERS
 
 def parse_args(default_table_name: str, default_download_directory):
     """
@@ -30,9 +30,13 @@ def parse_args(default_table_name: str, default_download_directory):
     parser.add_argument("--table-name", type=str, default=f"{default_table_name}", help="DB table name")
     parser.add_argument("--skip-database", action="store_true", default=False, help="Skip record insertion to database")
     parser.add_argument("--reset-table", action="store_true", default=False, help="Reset the media table in DB")
+    parser.add_argument("--skip-legacy-hashes", action="store_true", default=False, help="Only compute BLAKE3 (store NULL for MD5/SHA256/SHA512)")
+    parser.add_argument("--native-blake3", action="store_true", default=False, help="Use the native BLAKE3 binding for the blake3 column instead of BLAKE2b (not comparable with existing rows)")
     
     # Add YOLO provider arguments - simplified
     parser.add_argument("--use-remote-yolo", action="store_true", default=True, help="Use remote YOLO API instead of local model")
+    parser.add_argument("--yolo-model", type=str, default="model/yolov8x.pt", help="Local YOLO model (.pt, or an exported ONNX/OpenVINO/TensorRT model)")
+    parser.add_argument("--yolo-precision", choices=["auto", "fp16", "fp32"], default="auto", help="Local YOLO inference precision (auto: FP16 on CUDA)")
     
     # Create subparsers for different modes
     subparsers = parser.add_subparsers(dest="mode", required=True, help="Operation mode")
@@ -45,6 +49,7 @@ def parse_args(default_table_name: str, default_download_directory):
     instagram_parser.add_argument("--save-to", type=str, default=None, help="Directory to save downloaded media (default: profile name)")
     instagram_parser.add_argument("--resume", action="store_true", default=True, help="Resume from last post (default: True)")
     instagram_parser.add_argument("--limit", type=int, default=None, help="Limit the number of posts to download")
+    instagram_parser.add_argument("--download-workers", type=int, default=DOWNLOAD_WORKERS, help=f"Posts downloaded concurrently (default: {DOWNLOAD_WORKERS}; 1 = sequential)")
     
     # 2. Reverse scan mode
     reverse_parser = subparsers.add_parser("scan", help="Scan local directory and process files")
@@ -116,6 +121,7 @@ def main():
     MAX_RETRIES = 3  # For Instaloader connection attempts
     DEFAULT_TABLE_NAME = "tbl_fetcher"
     DEFAULT_DOWNLOAD_DIRECTORY = '/mnt/nas3/projects/assets/스크래퍼/인스타'
+    HASH_CACHE_PATH = "fetcher_hash_cache_{algorithm}.sqlite"  # (path, size, mtime) -> BLAKE3 cache for re-scans
     
     # YOLO remote defaults
     REMOTE_YOLO_URL = "http://172.16.8.45:8000"
@@ -127,7 +133,8 @@ def main():
     args = parse_args(DEFAULT_TABLE_NAME, DEFAULT_DOWNLOAD_DIRECTORY)
 
     # Setup dependencies
-    hash_calculator = HashCalculator()
+    hash_calculator = HashCalculator(native_blake3=args.native_blake3)
+    hash_cache = FileHashCache(HASH_CACHE_PATH.format(algorithm=hash_calculator.blake3_algorithm))
     video_fingerprinter = VideoFingerprinter()
 
     yolo_provider = get_yolo_provider(
@@ -136,10 +143,11 @@ def main():
         max_retries=REMOTE_YOLO_RETRIES,
         retry_delay=REMOTE_YOLO_RETRY_DELAY,
         enable_fallback=REMOTE_YOLO_FALLBACK_ENABLED,
-        model_path="model/yolov8x.pt",
+        model_path=args.yolo_model,
         iou=0.5,
         conf=0.5,
-        device="auto"
+        device="auto",
+        precision=args.yolo_precision
 )
     
     # Database connection
@@ -170,7 +178,10 @@ def main():
         hash_calculator=hash_calculator,
         yolo_provider=yolo_provider,
         video_fingerprinter=video_fingerprinter,
-        skip_database=args.skip_database
+        skip_database=args.skip_database,
+        hash_cache=hash_cache,
+        compute_legacy_hashes=not args.skip_legacy_hashes,
+        download_workers=getattr(args, "download_workers", DOWNLOAD_WORKERS)  # download mode only
     )
 
     # Possibly reset table
@@ -244,6 +255,8 @@ def main():
         # Clean up
         if db_connection:
             db_connection.close()
+        hash_cache.close()
+        instagram_fetcher.close()
             
     logger.info(f"[bright_black][Main]🏠[/bright_black] 🎉🎈🎉🍾🎊  All done!!! 🎊 🍾🎈🎉🎉")
 
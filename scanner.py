@@ -15,7 +15,7 @@ from dataclasses import dataclass
 
 from source.logging_modules import CustomLogger
 from source.database_modules import DatabaseConnection, DatabaseManager
-from source.hash_modules import HashCalculator
+from source.hash_modules import HashCalculator, FileHashCache
 from source.fingerprint_modules import VideoFingerprinter
 from source.yolo_modules import YoloProvider
 from source.scanner_modules import Scanner
@@ -25,6 +25,7 @@ from source.scanner_modules import Scanner
 # ------------------------------------------------------------------------
 global_executor = None   # For shutting down the ProcessPoolExecutor
 stop_flag = False        # For single-process immediate stop
+HASH_CACHE_PATH = "scanner_hash_cache_{algorithm}.sqlite"  # (path, size, mtime) -> BLAKE3 cache for re-scans, shared by all workers
 
 def handle_sigint(sig, frame):
     """
@@ -168,6 +169,7 @@ def process_directory_group(
         
         # Create scanning components
         hash_calculator = HashCalculator()
+        hash_cache = FileHashCache(HASH_CACHE_PATH.format(algorithm=hash_calculator.blake3_algorithm))
         video_fingerprinter = VideoFingerprinter()
         yolo_provider = YoloProvider(yolo_model_path, iou=0.5, conf=0.5, device="auto")
         
@@ -181,7 +183,9 @@ def process_directory_group(
             hash_calculator=hash_calculator,
             yolo_provider=yolo_provider,
             video_fingerprinter=video_fingerprinter,
-            stop_flag_ref=check_stop_flag
+            stop_flag_ref=check_stop_flag,
+            hash_cache=hash_cache,
+            image_hash_processes=1  # The directory groups already run one process per worker
         )
         
         # Process each directory in the group sequentially
@@ -206,6 +210,7 @@ def process_directory_group(
         finally:
             # Clean up
             db_connection.close()
+            hash_cache.close()
             logger.info(f"Completed processing group with {processed_count}/{len(group_directories)} directories")
             return processed_count
             
@@ -213,6 +218,8 @@ def process_directory_group(
         logger.error(f"Error in process_directory_group: {e}", exc_info=True)
         if 'db_connection' in locals():
             db_connection.close()
+        if 'hash_cache' in locals():
+            hash_cache.close()
         return 0
 
 
@@ -541,9 +548,12 @@ def main():
         logger.error(f"Failed to initialize database table: {e}")
         return
 
+    hash_cache = None
+    scanner = None
     try:
         # Create scanning modules
         hash_calculator = HashCalculator()
+        hash_cache = FileHashCache(HASH_CACHE_PATH.format(algorithm=hash_calculator.blake3_algorithm))
         video_fingerprinter = VideoFingerprinter()
         yolo_provider = YoloProvider(YOLO_MODEL_PATH, iou=0.5, conf=0.5, device="auto")
 
@@ -553,7 +563,8 @@ def main():
             hash_calculator=hash_calculator,
             yolo_provider=yolo_provider,
             video_fingerprinter=video_fingerprinter,
-            stop_flag_ref=lambda: stop_flag
+            stop_flag_ref=lambda: stop_flag,
+            hash_cache=hash_cache
         )
 
         # If you want a pre-scan stats
@@ -604,6 +615,11 @@ def main():
         logger.warning("Scan interrupted by user in main.")
     except Exception as e:
         logger.error(f"Error in main process: {e}", exc_info=True)
+    finally:
+        if scanner is not None:
+            scanner.close()
+        if hash_cache is not None:
+            hash_cache.close()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,24 @@
 import os
 import pyodbc
+from typing import List, Set, Dict, Tuple, Any
 from datetime import datetime
 from source.logging_modules import CustomLogger
 
+# SQL Server allows at most 2100 parameters per statement; stay well below it for IN (...) lists
+MAX_IN_PARAMS = 1000
+
+# Columns written by DatabaseManager.insert_many, in parameter order
+_COMMON_INSERT_COLUMNS = (
+    "file_path", "file_directory", "file_name", "file_type", "file_extension", "file_size",
+    "blake3", "md5", "sha256", "sha512",
+)
+_IMAGE_ONLY_COLUMNS = ("dhash", "phash", "whash", "chash", "ahash", "has_human", "has_human_score", "has_human_count")
+_VIDEO_ONLY_COLUMNS = ("video_fingerprint", "video_width", "video_height", "video_resolution", "video_fps", "video_length")
+INSERT_COLUMNS = _COMMON_INSERT_COLUMNS + _IMAGE_ONLY_COLUMNS + _VIDEO_ONLY_COLUMNS
+# Image rows leave the video columns NULL and video rows the image/YOLO columns (has_human keeps its DEFAULT 0)
+IMAGE_INSERT_COLUMNS = _COMMON_INSERT_COLUMNS + _IMAGE_ONLY_COLUMNS
+VIDEO_INSERT_COLUMNS = _COMMON_INSERT_COLUMNS + _VIDEO_ONLY_COLUMNS
+
 class DatabaseConnection:
     """
     Manages a single database connection lifecycle: connect on init,
@@ -217,11 +233,14 @@ class DatabaseManager:
         video_fps: int = None,
         video_length: float = None,
         has_human_score: float = 0.0,
-        has_human_count: int = 0
+        has_human_count: int = 0,
+        commit: bool = True
     ) -> bool:
         """
         Insert data into the specified table. Returns True if insertion 
         is successful, False if there's a constraint violation or missing fields.
+        With commit=False the row is left in the open transaction (and errors do not
+        roll it back) so the caller can commit a whole batch at once.
         """
         # Validate required fields
         if not file_path or not file_name or not file_type or not blake3:
@@ -295,9 +314,10 @@ class DatabaseManager:
             sql = f"INSERT INTO [dbo].[{table_name}] ({col_names}) VALUES ({placeholders})"
 
             cursor.execute(sql, values)
-            connection.commit()
+            if commit:
+                connection.commit()
 
-            self.logger.debug(f"[bright_black][DbManager]🗃️[/bright_black][bold #FFA500] Record inserted successfully: {file_path}[/bold #FFA500]")
+            self.logger.debug("[bright_black][DbManager]🗃️[/bright_black][bold #FFA500] Record inserted successfully: %s[/bold #FFA500]", file_path)
             return True
 
         except pyodbc.IntegrityError as e:
@@ -324,24 +344,91 @@ class DatabaseManager:
                 return False
             else:
                 self.logger.error(f"[bright_black][DbManager]🗃️[/bright_black][bold red]Integrity error inserting record: {e}[/bold red]")
-                connection.rollback()
+                if commit:
+                    connection.rollback()
                 return False
 
         except pyodbc.DataError as e:
             self.logger.error(f"[bright_black][DbManager]🗃️[/bright_black][bold red]Data error inserting record: {e}[/bold red]")
-            connection.rollback()
+            if commit:
+                connection.rollback()
             return False
 
         except pyodbc.Error as e:
             self.logger.error(f"[bright_black][DbManager]🗃️[/bright_black][bold red]Database error inserting record: {e}[/bold red]")
-            connection.rollback()
+            if commit:
+                connection.rollback()
             return False
 
         except Exception as e:
             self.logger.error(f"[bright_black][DbManager]🗃️[/bright_black][bold red]Unexpected error inserting record: {e}[/bold red]")
-            connection.rollback()
+            if commit:
+                connection.rollback()
             return False
 
+    def insert_many(
+        self,
+        connection: pyodbc.Connection,
+        table_name: str,
+        records: List[Dict[str, Any]],
+        columns: Tuple[str, ...] = INSERT_COLUMNS
+    ) -> int:
+        """
+        Insert a batch of records (dicts keyed like insert()'s arguments) with a single
+        fast_executemany round-trip and commit them together. If any row violates a
+        constraint, the batch is rolled back and retried row by row so the others still land.
+
+        :param connection: An active pyodbc.Connection object
+        :param table_name: Target table
+        :param records:    Records to insert; missing columns are written as NULL
+        :param columns:    Columns named in the INSERT (IMAGE_INSERT_COLUMNS / VIDEO_INSERT_COLUMNS
+                           for single-type batches; columns left out take the table default)
+        :return:           Number of rows inserted
+        """
+        if not records:
+            return 0
+
+        col_names = ", ".join(f"[{c}]" for c in columns)
+        placeholders = ", ".join("?" * len(columns))
+        sql = f"INSERT INTO [dbo].[{table_name}] ({col_names}) VALUES ({placeholders})"
+        rows = [tuple(record.get(c) for c in columns) for record in records]
+
+        try:
+            cursor = connection.cursor()
+            cursor.fast_executemany = True
+            cursor.executemany(sql, rows)
+            connection.commit()
+            self.logger.debug(f"[bright_black][DbManager]🗃️[/bright_black][bold #FFA500] {len(rows)} records inserted successfully.[/bold #FFA500]")
+            return len(rows)
+
+        except pyodbc.IntegrityError as e:
+            self.logger.warning(f"[bright_black][DbManager]🗃️[/bright_black][yellow] Constraint violation in batch insert, retrying {len(rows)} rows individually: {e}[/yellow]")
+            connection.rollback()
+            inserted = sum(1 for record in records if self.insert(connection, table_name, commit=False, **record))
+            connection.commit()
+            return inserted
+
+        except pyodbc.Error as e:
+            self.logger.error(f"[bright_black][DbManager]🗃️[/bright_black][bold red]Database error in batch insert: {e}[/bold red]")
+            connection.rollback()
+            return 0
+
+    def existing_blake3(self, connection: pyodbc.Connection, table_name: str, blake3_values: List[str]) -> Set[str]:
+        """
+        Return the subset of blake3_values already present in the table, using one
+        WHERE blake3 IN (...) query per MAX_IN_PARAMS values instead of one query per hash.
+        """
+        found = set()
+        unique_values = list(dict.fromkeys(blake3_values))
+        with connection.cursor() as cursor:
+            for start in range(0, len(unique_values), MAX_IN_PARAMS):
+                chunk = unique_values[start:start + MAX_IN_PARAMS]
+                placeholders = ", ".join("?" * len(chunk))
+                # blake3 is CHAR(512): trim the padding so values compare equal to the Python strings
+                cursor.execute(f"SELECT RTRIM([blake3]) FROM [dbo].[{table_name}] WHERE [blake3] IN ({placeholders})", chunk)
+                found.update(row[0] for row in cursor.fetchall())
+        return found
+
     def fetch(self, connection: pyodbc.Connection, query: str):
         """
         Execute a SELECT query and return all rows.
@@ -3,11 +3,32 @@
 import re
 from datetime import datetime
 import pyodbc
+import numpy as np
 from typing import List, Dict, Tuple
-from collections import defaultdict, deque
+from collections import defaultdict, deque, namedtuple
+from itertools import groupby
+from operator import attrgetter
 
 from source.logging_modules import CustomLogger
 
+# Columns shared by the source table and every deduped table
+BASE_COLUMNS = [
+    "file_path","file_name","file_directory","file_type","file_extension",
+    "file_size","md5","sha256","sha512","blake3",
+    "dhash","phash","whash","chash","ahash",
+    "video_fingerprint","video_width","video_height","video_resolution",
+    "video_fps","video_length","has_human","has_human_score","has_human_count","date"
+]
+
+# Perceptual hash columns: hex strings in the source table, binary in deduped tables
+HASH_COLUMNS = ["dhash","phash","whash","chash","ahash"]
+
+# Lightweight row for the image projection loaded by _load_image_rows
+ImageRow = namedtuple("ImageRow", [
+    "file_path","file_name","file_directory","file_size","date",
+    "dhash","phash","whash","chash","ahash"
+])
+
 class Deduper:
     """
     High-level class that uses:
@@ -37,16 +58,15 @@ class Deduper:
         target_table: str = None
     ) -> str:
         """
-        1) Load entire table into memory
-        2) Create new table named <source_table>_deduped_<method> (or user-specified target)
-        3) Process each directory separately:
+        1) Create new table named <source_table>_deduped_<method> (or user-specified target)
+        2) Copy every source row into it server-side with is_representative = 1
+        3) Load only the image rows needed for clustering and process each directory separately:
            a. Cluster images by hamming distance using the pre-calculated hash values
-           b. Mark one representative per cluster
-           c. Mark all videos as representatives
-        4) Insert all rows with is_representative flag
+           b. Keep one representative per cluster
+           (videos and anything not clustered stay representatives)
+        4) Flip is_representative to 0 for the non-representative images
         5) Return the name of the created table
         """
-        rows = self._load_table_into_memory(connection, source_table)
         if target_table is None:
             target_table = f"{source_table}_deduped_{method}"
             
@@ -58,69 +78,46 @@ class Deduper:
         
         self._create_deduped_table_with_is_representative(connection, source_table, target_table)
 
-        # Group by directory
-        dir_map = defaultdict(list)
-        for r in rows:
-            dir_map[r.file_directory].append(r)
+        # Copy all rows server-side, defaulting every row to representative (committed with the updates below)
+        insert_count = self._copy_source_into_target(
+            connection, source_table, target_table, {"dedupe_method": method}
+        )
 
-        # Track which file_path => is_representative
-        is_rep_map = {}
+        rows = self._load_image_rows(connection, source_table)
 
-        # Process each directory separately
-        for dir_key, dir_rows in dir_map.items():
-            self.logger.info(f"[bright_black][Deduper]📸[/bright_black] Processing directory: [bold cyan]{dir_key}[/bold cyan] ({len(dir_rows)} files)")
-            
-            # Separate images vs videos
-            image_rows = [r for r in dir_rows if r.file_type.lower().startswith("image")]
-            video_rows = [r for r in dir_rows if not r.file_type.lower().startswith("image")]
+        # Track which file_paths lose their representative flag
+        non_rep_paths = []
+
+        # Process each directory separately (rows arrive ordered by directory, so each is one contiguous run)
+        for dir_key, dir_rows_iter in groupby(rows, key=attrgetter('file_directory')):
+            dir_rows = list(dir_rows_iter)
+            self.logger.info(f"[bright_black][Deduper]📸[/bright_black] Processing directory: [bold cyan]{dir_key}[/bold cyan] ({len(dir_rows)} images)")
 
             # Cluster using the pre-calculated hash values from DB
-            clusters = self._cluster_by_hash(image_rows, method, distance_threshold)
+            clusters = self._cluster_by_hash(dir_rows, method, distance_threshold)
 
             # Pick 1 rep per cluster
             for cluster in clusters:
-                if not cluster:
+                # Singletons are already representatives in the target table
+                if len(cluster) <= 1:
                     continue
                 #rep = cluster[0]  # Simple: pick the first
                 rep = max(cluster, key=lambda row: self._get_representative_score(row))
                 for row in cluster:
-                    is_rep_map[row.file_path] = (row.file_path == rep.file_path)
+                    if row.file_path != rep.file_path:
+                        non_rep_paths.append(row.file_path)
 
-            # Mark all videos as representatives
-            for v in video_rows:
-                is_rep_map[v.file_path] = True
-
-        # Insert all rows with their is_representative flag
-        insert_count = 0
-        cur = connection.cursor()
-
-        for row in rows:
-            fp = row.file_path
-            rep_val = is_rep_map.get(fp, True)  # Default to True for anything not processed
-
-            col_names, col_values = self._extract_row_data(row)
-            col_names.append("is_representative")
-            col_names.append("dedupe_method")
-            col_values.append(1 if rep_val else 0)
-            col_values.append(method)
-
-            placeholders = ", ".join(["?"] * len(col_names))
-            col_str = ", ".join(f"[{cn}]" for cn in col_names)
-            sql = f"INSERT INTO [dbo].[{target_table}] ({col_str}) VALUES ({placeholders});"
-            try:
-                cur.execute(sql, col_values)
-                insert_count += 1
-            except Exception as e:
-                connection.rollback()
-                self.logger.error(f"[bright_black][Deduper]📸[/bright_black][bold red] Error inserting row for {fp}: {e}[/bold red]")
-                continue
+        failed_paths = self._mark_non_representatives(connection, target_table, non_rep_paths)
 
+        # The copy and all updates share one transaction, committed once here
         connection.commit()
         self.logger.info(f"[bright_black][Deduper]📸[/bright_black][bold #FFA500] Inserted {insert_count} rows into {target_table}[/bold #FFA500]")
+        if failed_paths:
+            self.logger.error(f"[bright_black][Deduper]📸[/bright_black][bold red] Failed to mark {len(failed_paths)} non-representatives (left as representatives)[/bold red]")
         
         # Log summary of representatives
-        rep_count = sum(1 for val in is_rep_map.values() if val)
-        self.logger.info(f"[bright_black][Deduper]📸[/bright_black][bold green] Total representatives: {rep_count}/{len(is_rep_map)}[/bold green]")
+        rep_count = insert_count - (len(non_rep_paths) - len(failed_paths))
+        self.logger.info(f"[bright_black][Deduper]📸[/bright_black][bold green] Total representatives: {rep_count}/{insert_count}[/bold green]")
         
         return target_table
 
@@ -136,17 +133,15 @@ class Deduper:
         target_table: str = None
     ) -> str:
         """
-        1) Load entire table
-        2) Create target table with is_representative column
-        3) Process each directory separately:
-           a. For each directory:
-              i.   First cluster by dHash with threshold_dhash using pre-calculated hashes
-              ii.  For each cluster found, refine it with pHash using threshold_phash
-              iii. Mark one representative per final cluster
-           b. Mark all videos as representatives
-        4) Insert into new table, returning the new table name
+        1) Create target table with is_representative column
+        2) Copy every source row into it server-side with is_representative = 1
+        3) Load only the image rows and process each directory separately:
+           i.   First cluster by dHash with threshold_dhash using pre-calculated hashes
+           ii.  For each cluster found, refine it with pHash using threshold_phash
+           iii. Keep one representative per final cluster
+           (videos and anything not clustered stay representatives)
+        4) Flip is_representative to 0 for the non-representative images, returning the new table name
         """
-        rows = self._load_table_into_memory(connection, source_table)
         if target_table is None:
             target_table = f"{source_table}_deduped_dhash_phash"
             
@@ -158,24 +153,24 @@ class Deduper:
 
         self._create_deduped_table_with_is_representative(connection, source_table, target_table)
 
-        # Group by directory
-        dir_map = defaultdict(list)
-        for r in rows:
-            dir_map[r.file_directory].append(r)
+        # Copy all rows server-side, defaulting every row to representative (committed with the updates below)
+        insert_count = self._copy_source_into_target(
+            connection, source_table, target_table,
+            {"dedupe_phase1": f"dHash:{threshold_dhash}", "dedupe_phase2": f"pHash:{threshold_phash}"}
+        )
 
-        # Track which file_path => is_representative
-        is_rep_map = {}
+        rows = self._load_image_rows(connection, source_table)
 
-        # Process each directory separately
-        for dir_key, dir_rows in dir_map.items():
-            self.logger.info(f"[bright_black][Deduper]📸[/bright_black] Processing directory: [bold cyan]{dir_key}[/bold cyan] ({len(dir_rows)} files)")
-            
-            # Separate images vs videos
-            image_rows = [r for r in dir_rows if r.file_type.lower().startswith("image")]
-            video_rows = [r for r in dir_rows if not r.file_type.lower().startswith("image")]
+        # Track which file_paths lose their representative flag
+        non_rep_paths = []
+
+        # Process each directory separately (rows arrive ordered by directory, so each is one contiguous run)
+        for dir_key, dir_rows_iter in groupby(rows, key=attrgetter('file_directory')):
+            dir_rows = list(dir_rows_iter)
+            self.logger.info(f"[bright_black][Deduper]📸[/bright_black] Processing directory: [bold cyan]{dir_key}[/bold cyan] ({len(dir_rows)} images)")
 
             # Phase 1: Cluster by dHash using pre-calculated hashes
-            d_clusters = self._cluster_by_hash(image_rows, 'dhash', threshold_dhash)
+            d_clusters = self._cluster_by_hash(dir_rows, 'dhash', threshold_dhash)
             
             # Phase 2: Refine each dHash cluster with pHash
             final_clusters = []
@@ -188,51 +183,27 @@ class Deduper:
 
             # Pick 1 rep per cluster
             for cluster in final_clusters:
-                if not cluster:
+                # Singletons are already representatives in the target table
+                if len(cluster) <= 1:
                     continue
                 # Pick the row with the highest representative score (if you want the first one, use cluster[0])
                 rep = max(cluster, key=lambda row: self._get_representative_score(row))
                 
                 for row_obj in cluster:
-                    is_rep_map[row_obj.file_path] = (row_obj.file_path == rep.file_path)
-
-            # Mark all videos as representatives
-            for v in video_rows:
-                is_rep_map[v.file_path] = True
+                    if row_obj.file_path != rep.file_path:
+                        non_rep_paths.append(row_obj.file_path)
 
-        # Now insert every row with its is_representative flag
-        insert_count = 0
-        cur = connection.cursor()
-
-        for row in rows:
-            fp = row.file_path
-            rep_val = is_rep_map.get(fp, True)  # Default to True for anything not processed
-
-            col_names, col_values = self._extract_row_data(row)
-            col_names.append("is_representative")
-            col_names.append("dedupe_phase1")
-            col_names.append("dedupe_phase2")
-            col_values.append(1 if rep_val else 0)
-            col_values.append(f"dHash:{threshold_dhash}")
-            col_values.append(f"pHash:{threshold_phash}")
-
-            placeholders = ", ".join(["?"] * len(col_names))
-            col_str = ", ".join(f"[{cn}]" for cn in col_names)
-            sql = f"INSERT INTO [dbo].[{target_table}] ({col_str}) VALUES ({placeholders});"
-            try:
-                cur.execute(sql, col_values)
-                insert_count += 1
-            except Exception as e:
-                connection.rollback()
-                self.logger.error(f"[bright_black][Deduper]📸[/bright_black][bold red] Error inserting row for {fp}: {e}[/bold red]")
-                continue
+        failed_paths = self._mark_non_representatives(connection, target_table, non_rep_paths)
 
+        # The copy and all updates share one transaction, committed once here
         connection.commit()
         self.logger.info(f"[bright_black][Deduper]📸[/bright_black][bold #FFA500] Inserted {insert_count} rows into {target_table}[/bold #FFA500]")
+        if failed_paths:
+            self.logger.error(f"[bright_black][Deduper]📸[/bright_black][bold red] Failed to mark {len(failed_paths)} non-representatives (left as representatives)[/bold red]")
         
         # Log summary of representatives
-        rep_count = sum(1 for val in is_rep_map.values() if val)
-        self.logger.info(f"[bright_black][Deduper]📸[/bright_black][bold green] Total representatives: {rep_count}/{len(is_rep_map)}[/bold green]")
+        rep_count = insert_count - (len(non_rep_paths) - len(failed_paths))
+        self.logger.info(f"[bright_black][Deduper]📸[/bright_black][bold green] Total representatives: {rep_count}/{insert_count}[/bold green]")
         
         return target_table
 
@@ -272,44 +243,31 @@ class Deduper:
         :param threshold: Maximum hamming distance to consider similar
         :return: List of clusters (each cluster is a list of row objects)
         """
-        # Filter out rows with NULL hash values
-        valid_rows = []
-        row_to_idx = {}  # Map each row to an index
-        
-        for i, row in enumerate(rows):
+        # Filter out rows with NULL hash values and group rows sharing the exact same hash,
+        # so pairwise distances are only computed between distinct hash values
+        exact_groups = defaultdict(list)
+        for row in rows:
             hash_val = getattr(row, hash_type)
             if hash_val is not None and hash_val.strip():
-                valid_rows.append(row)
-                row_to_idx[row.file_path] = i
+                exact_groups[hash_val].append(row)
         
-        if not valid_rows:
+        if not exact_groups:
             return []
             
-        # Build adjacency list using hamming distance between the hash strings
-        # Use row indices instead of row objects (which aren't hashable)
-        adj = [[] for _ in range(len(valid_rows))]
+        unique_hashes = list(exact_groups.keys())
+            
+        # Build adjacency list using hamming distance between the unique hash strings
+        adj = [[] for _ in range(len(unique_hashes))]
         
-        for i in range(len(valid_rows)):
-            for j in range(i+1, len(valid_rows)):
-                row1 = valid_rows[i]
-                row2 = valid_rows[j]
-                hash1 = getattr(row1, hash_type)
-                hash2 = getattr(row2, hash_type)
-                
-                # Calculate hamming distance between hash strings
-                # Make sure to compare just the minimum length if they differ
-                min_len = min(len(hash1), len(hash2))
-                dist = sum(c1 != c2 for c1, c2 in zip(hash1[:min_len], hash2[:min_len]))
-                
-                if dist <= threshold:
-                    adj[i].append(j)
-                    adj[j].append(i)
+        for i, j in self._similar_hash_pairs(unique_hashes, threshold):
+            adj[i].append(j)
+            adj[j].append(i)
         
-        # Find clusters using BFS
-        visited = [False] * len(valid_rows)
+        # Find clusters of unique hashes using BFS, then expand each hash to its rows
+        visited = [False] * len(unique_hashes)
         clusters = []
         
-        for i in range(len(valid_rows)):
+        for i in range(len(unique_hashes)):
             if not visited[i]:
                 cluster = []
                 queue = deque([i])
@@ -317,7 +275,7 @@ class Deduper:
                 
                 while queue:
                     curr_idx = queue.popleft()
-                    cluster.append(valid_rows[curr_idx])
+                    cluster.extend(exact_groups[unique_hashes[curr_idx]])
                     
                     for neighbor_idx in adj[curr_idx]:
                         if not visited[neighbor_idx]:
@@ -328,13 +286,122 @@ class Deduper:
         
         return clusters
         
-    def _load_table_into_memory(self, connection, table_name: str):
+    def _similar_hash_pairs(self, hashes: List[str], threshold: int, block_size: int = 64):
+        """
+        Yield index pairs (i, j), i < j, whose hash strings differ in at most `threshold`
+        characters, comparing only up to the shorter string's length.
+        The N x N comparison is done in block_size x block_size tiles over the upper
+        triangle so each tile's (B, B, hash_len) temporary stays cache-sized.
+        """
+        n = len(hashes)
+        lengths = np.fromiter((len(h) for h in hashes), dtype=np.int64, count=n)
+        max_len = int(lengths.max())
+        chars = np.zeros((n, max_len), dtype=np.uint8)
+        for idx, h in enumerate(hashes):
+            chars[idx, :len(h)] = np.frombuffer(h.encode(), dtype=np.uint8)[:max_len]
+        valid = np.arange(max_len)[None, :] < lengths[:, None]
+
+        for i0 in range(0, n, block_size):
+            i1 = min(i0 + block_size, n)
+            for j0 in range(i0, n, block_size):
+                j1 = min(j0 + block_size, n)
+                diff = chars[i0:i1, None, :] != chars[None, j0:j1, :]
+                diff &= valid[i0:i1, None, :] & valid[None, j0:j1, :]
+                dist = diff.sum(axis=-1)
+                for bi, bj in np.argwhere(dist <= threshold):
+                    i, j = i0 + int(bi), j0 + int(bj)
+                    if i < j:
+                        yield i, j
+
+    def _load_image_rows(self, connection, table_name: str, fetch_size: int = 10000):
+        """
+        Load only the columns needed to cluster and score image rows.
+        Videos and other types are never clustered, so they stay in the DB.
+        Rows are fetched in fetch_size batches and kept as ImageRow tuples rather than pyodbc.Row.
+        """
+        self.logger.info(f"[bright_black][Deduper]📸[/bright_black] Loading image hashes from [bold cyan]{table_name}[/bold cyan]...")
+        col_str = ", ".join(f"[{cn}]" for cn in ImageRow._fields)
+        query = f"""
+            SELECT {col_str}
+            FROM [dbo].[{table_name}]
+            WHERE [file_type] LIKE 'image%'
+            ORDER BY [file_directory] COLLATE Latin1_General_BIN2;
+        """
+        rows = []
+        try:
+            cursor = connection.cursor()
+            cursor.arraysize = fetch_size
+            cursor.execute(query)
+            while True:
+                batch = cursor.fetchmany(fetch_size)
+                if not batch:
+                    break
+                rows.extend(ImageRow(*r) for r in batch)
+        except pyodbc.Error as e:
+            self.logger.error(f"[bright_black][Deduper]📸[/bright_black][bold red] Error loading image rows from {table_name}: {e}[/bold red]")
+            raise
+        return rows
+
+    def _copy_source_into_target(self, connection, source_table: str, target_table: str, method_columns: Dict[str, str]) -> int:
+        """
+        Copy every source row into the target with a single server-side INSERT ... SELECT,
+        marking all rows as representatives. Returns the number of rows copied.
         """
-        Load entire table into memory.
+        col_str = ", ".join(f"[{cn}]" for cn in BASE_COLUMNS)
+        # Hex hash strings are decoded to bytes on the server (style 2 = hex without 0x)
+        select_str = ", ".join(
+            f"CONVERT(VARBINARY(128), RTRIM([{cn}]), 2)" if cn in HASH_COLUMNS else f"[{cn}]"
+            for cn in BASE_COLUMNS
+        )
+        method_str = "".join(f", [{cn}]" for cn in method_columns)
+        method_placeholders = "".join(", ?" for _ in method_columns)
+        # NOCOUNT suppresses DONE_IN_PROC row-count messages, so the count is selected explicitly
+        sql = f"""
+            SET NOCOUNT ON;
+            INSERT INTO [dbo].[{target_table}] ({col_str}, [is_representative]{method_str})
+            SELECT {select_str}, 1{method_placeholders}
+            FROM [dbo].[{source_table}];
+            SELECT @@ROWCOUNT;
         """
-        self.logger.info(f"[bright_black][Deduper]📸[/bright_black] Loading table [bold cyan]{table_name}[/bold cyan] into memory...")
-        query = f"SELECT * FROM [dbo].[{table_name}];"
-        return self.db_manager.fetch(connection, query)
+        cursor = connection.cursor()
+        cursor.execute(sql, list(method_columns.values()))
+        (insert_count,) = cursor.fetchone()
+        return insert_count
+
+    def _mark_non_representatives(self, connection, target_table: str, file_paths: List[str], batch_size: int = 1000) -> List[str]:
+        """
+        Set is_representative = 0 for the given file paths only (the delta from the default of 1),
+        sending them as parameter arrays of batch_size rows via fast_executemany.
+        Runs inside the caller's transaction (no commit here). Each batch sits behind a savepoint,
+        so a failed batch is undone as a whole and its paths are returned (left as representatives).
+        If the error already aborted the transaction (e.g. a deadlock victim), nothing is left to
+        keep: the transaction is rolled back and the error re-raised.
+        """
+        failed_paths = []
+        if not file_paths:
+            return failed_paths
+        self.logger.info(f"[bright_black][Deduper]📸[/bright_black] Marking {len(file_paths)} non-representatives in [bold cyan]{target_table}[/bold cyan]")
+        sql = f"UPDATE [dbo].[{target_table}] SET [is_representative] = 0 WHERE [file_path] = ?;"
+        cursor = connection.cursor()
+        cursor.execute("SET NOCOUNT ON;")
+        cursor.fast_executemany = True
+        for start in range(0, len(file_paths), batch_size):
+            batch = file_paths[start:start + batch_size]
+            cursor.execute("SAVE TRANSACTION mark_non_reps;")
+            try:
+                cursor.executemany(sql, [(fp,) for fp in batch])
+            except pyodbc.Error as e:
+                try:
+                    # Undo whatever part of the batch was applied
+                    cursor.execute("ROLLBACK TRANSACTION mark_non_reps;")
+                except pyodbc.Error:
+                    # The savepoint went with the transaction: fail the whole dedupe instead
+                    self.logger.error(f"[bright_black][Deduper]📸[/bright_black][bold red] Transaction aborted while marking non-representatives: {e}[/bold red]")
+                    connection.rollback()
+                    raise e
+                failed_paths.extend(batch)
+                self.logger.error(f"[bright_black][Deduper]📸[/bright_black][bold red] Error marking {len(batch)} non-representatives: {e}[/bold red]")
+        return failed_paths
 
     def _create_deduped_table_with_is_representative(self, connection, source_table, target_table):
         """
@@ -356,11 +423,12 @@ class Deduper:
             [sha256]            CHAR(256)      NULL,
             [sha512]            CHAR(512)      NULL,
             [blake3]            CHAR(512)      NOT NULL,
-            [dhash]             CHAR(256)      NULL,
-            [phash]             CHAR(256)      NULL,
-            [whash]             CHAR(256)      NULL,
-            [chash]             CHAR(256)      NULL,
-            [ahash]             CHAR(256)      NULL,
+            -- Perceptual hashes stored as raw bytes (1024-bit hashes; colorhash is shorter)
+            [dhash]             BINARY(128)    NULL,
+            [phash]             BINARY(128)    NULL,
+            [whash]             BINARY(128)    NULL,
+            [chash]             VARBINARY(128) NULL,
+            [ahash]             BINARY(128)    NULL,
             [video_fingerprint] CHAR(512)      NULL,
             [video_width]       INT            NULL,
             [video_height]      INT            NULL,
@@ -391,7 +459,7 @@ class Deduper:
             ALTER TABLE [dbo].[{target_table}]
             ADD CONSTRAINT [UQ_{target_table}_file_path] UNIQUE NONCLUSTERED ([file_path] ASC);
         """)
-        for htype in ['dhash','phash','whash','chash','ahash']:
+        for htype in HASH_COLUMNS:
             cursor.execute(f"""
                 CREATE NONCLUSTERED INDEX [IX_{target_table}_{htype}]
                 ON [dbo].[{target_table}] ([{htype}] ASC);
@@ -408,43 +476,3 @@ class Deduper:
         """)
         connection.commit()
         self.logger.info(f"[bright_black][Deduper]📸[/bright_black][bold green] Table '{target_table}' created successfully.[/bold green]")
-
-    def _extract_row_data(self, row: pyodbc.Row):
-        """
-        Return a tuple (col_names, col_values) for the base schema from your examples.
-        """
-        col_names = [
-            "file_path","file_name","file_directory","file_type","file_extension",
-            "file_size","md5","sha256","sha512","blake3",
-            "dhash","phash","whash","chash","ahash",
-            "video_fingerprint","video_width","video_height","video_resolution",
-            "video_fps","video_length","has_human","has_human_score","has_human_count","date"
-        ]
-        col_values = [
-            row.file_path,
-            row.file_name,
-            row.file_directory,
-            row.file_type,
-            row.file_extension,
-            row.file_size,
-            row.md5,
-            row.sha256,
-            row.sha512,
-            row.blake3,
-            row.dhash,
-            row.phash,
-            row.whash,
-            row.chash,
-            row.ahash,
-            row.video_fingerprint,
-            row.video_width,
-            row.video_height,
-            row.video_resolution,
-            row.video_fps,
-            row.video_length,
-            row.has_human,
-            row.has_human_score,
-            row.has_human_count,
-            row.date
-        ]
-        return (col_names, col_values)
\ No newline at end of file
@@ -2,7 +2,12 @@
 import pywt
 import numpy as np
 from PIL import Image
+try:
+    from scipy.fft import dctn
+except ImportError:
+    dctn = None
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 class Deduper:
     """
@@ -22,11 +27,9 @@ class Deduper:
     def average_hash(image_path: str, hash_size: int = 8) -> int:
         with Image.open(image_path) as img:
             img = img.convert('L').resize((hash_size, hash_size), Image.ANTIALIAS)
-            pixels = list(img.getdata())
-        avg = sum(pixels) / len(pixels)
-        bits = [1 if px >= avg else 0 for px in pixels]
-        bit_string = ''.join(str(b) for b in bits)
-        return int(bit_string, 2)
+            pixels = np.array(img, dtype=np.uint8).flatten()
+        bits = (pixels >= pixels.mean()).astype(np.uint8)
+        return bits_to_int(bits)
 
     @staticmethod
     def dhash(image_path: str, hash_size: int = 8) -> int:
@@ -34,9 +37,8 @@ class Deduper:
             img = img.convert('L').resize((hash_size + 1, hash_size), Image.ANTIALIAS)
             pixels = np.array(img, dtype=np.uint8)
         diff = pixels[:, 1:] > pixels[:, :-1]
-        bits = diff.flatten().astype(int)
-        bit_string = ''.join(str(b) for b in bits)
-        return int(bit_string, 2)
+        bits = diff.flatten().astype(np.uint8)
+        return bits_to_int(bits)
 
     @staticmethod
     def phash(image_path: str, hash_size: int = 8, highfreq_factor: int = 4) -> int:
@@ -45,14 +47,39 @@ class Deduper:
             img = img.convert('L').resize((img_size, img_size), Image.ANTIALIAS)
             pixels = np.array(img, dtype=np.float32)
 
-        dct = dct_2d_numpy(pixels)
+        dct = dct_2d(pixels)
         dct_low_freq = dct[:hash_size, :hash_size]
         dct_mean = (np.sum(dct_low_freq) - dct_low_freq[0, 0]) / (hash_size*hash_size - 1)
 
         diff = dct_low_freq > dct_mean
-        bits = diff.flatten().astype(int)
-        bit_string = ''.join(str(b) for b in bits)
-        return int(bit_string, 2)
+        bits = diff.flatten().astype(np.uint8)
+        return bits_to_int(bits)
+
+    @staticmethod
+    def phash_batch(image_paths, hash_size: int = 8, highfreq_factor: int = 4, thread_count: int = 4) -> list[int]:
+        """
+        Compute pHash for many images at once: decode/resize in a thread pool,
+        then run a single DCT over the stacked (B, N, N) array.
+        """
+        if not image_paths:
+            return []
+
+        img_size = hash_size * highfreq_factor
+
+        def _load(image_path):
+            with Image.open(image_path) as img:
+                img = img.convert('L').resize((img_size, img_size), Image.LANCZOS)
+                return np.array(img, dtype=np.float32)
+
+        with ThreadPoolExecutor(max_workers=thread_count) as executor:
+            stack = np.stack(list(executor.map(_load, image_paths)))
+
+        dct = dct_2d(stack)
+        dct_low_freq = dct[:, :hash_size, :hash_size].reshape(len(image_paths), -1)
+        dct_mean = (dct_low_freq.sum(axis=1) - dct_low_freq[:, 0]) / (hash_size*hash_size - 1)
+
+        bits = (dct_low_freq > dct_mean[:, None]).astype(np.uint8)
+        return [bits_to_int(row) for row in bits]
 
     @staticmethod
     def wHash(image_path: str, hash_size: int = 8, mode: str = 'haar') -> int:
@@ -66,9 +93,8 @@ class Deduper:
         LL, (LH, HL, HH) = pywt.dwt2(pixels, mode)
         sub_band = LL.flatten()
         mean_val = np.mean(sub_band)
-        bits = [1 if px > mean_val else 0 for px in sub_band]
-        bit_string = ''.join(str(b) for b in bits)
-        return int(bit_string, 2)
+        bits = (sub_band > mean_val).astype(np.uint8)
+        return bits_to_int(bits)
 
     def compute_hash(self, image_path: str, method: str) -> int:
         m = method.lower()
@@ -84,10 +110,13 @@ class Deduper:
             raise ValueError(f"Unknown hash method: {method}")
 
     def cluster_images(self, image_paths, method='phash', distance_threshold=10):
-        # 1) Compute all hashes
-        hash_map = {}
-        for p in image_paths:
-            hash_map[p] = self.compute_hash(p, method)
+        # 1) Compute all hashes (pHash is batched through a single DCT call)
+        if method.lower() == 'phash':
+            hash_map = dict(zip(image_paths, self.phash_batch(image_paths)))
+        else:
+            hash_map = {}
+            for p in image_paths:
+                hash_map[p] = self.compute_hash(p, method)
 
         # 2) Build adjacency
         adj = {p: [] for p in image_paths}
@@ -120,31 +149,35 @@ class Deduper:
         return clusters
 
 
-def dct_2d_numpy(matrix: np.ndarray) -> np.ndarray:
-    M = dct_1d_numpy(matrix, axis=0)
-    M = dct_1d_numpy(M, axis=1)
-    return M
+def bits_to_int(bits: np.ndarray) -> int:
+    """
+    Pack a flat 0/1 array into an int (MSB first), matching int(''.join(bits), 2).
+    """
+    pad = -len(bits) % 8
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big') >> pad
 
-def dct_1d_numpy(x: np.ndarray, axis: int = -1) -> np.ndarray:
-    N = x.shape[axis]
-    alpha0 = np.sqrt(1.0 / N)
-    alphaK = np.sqrt(2.0 / N)
 
-    x = np.swapaxes(x, axis, -1)
-    out = np.zeros_like(x, dtype=np.float32)
-    n = np.arange(N)
+# Orthonormal DCT-II matrices keyed by size, built once and reused
+_DCT_CACHE: dict[int, np.ndarray] = {}
 
-    for k in range(N):
-        if k == 0:
-            out[..., k] = alpha0 * np.sum(
-                x * np.cos(np.pi * (2*n + 1) * k / (2.0*N)),
-                axis=-1
-            )
-        else:
-            out[..., k] = alphaK * np.sum(
-                x * np.cos(np.pi * (2*n + 1) * k / (2.0*N)),
-                axis=-1
-            )
+def _build_dct_matrix(N: int) -> np.ndarray:
+    n = np.arange(N)
+    C = np.cos(np.pi * (2*n[None, :] + 1) * n[:, None] / (2.0*N))
+    C[0, :] *= np.sqrt(1.0 / N)
+    C[1:, :] *= np.sqrt(2.0 / N)
+    return C.astype(np.float32)
 
-    out = np.swapaxes(out, axis, -1)
-    return out
\ No newline at end of file
+def dct_2d(pixels: np.ndarray) -> np.ndarray:
+    """
+    Orthonormal 2D DCT-II over the last two axes (works on a single image or a stack).
+    Uses scipy when available, otherwise two GEMMs against a cached cosine matrix.
+    """
+    if dctn is not None:
+        return dctn(pixels, axes=(-2, -1), type=2, norm='ortho')
+
+    rows, cols = pixels.shape[-2:]
+    if rows not in _DCT_CACHE:
+        _DCT_CACHE[rows] = _build_dct_matrix(rows)
+    if cols not in _DCT_CACHE:
+        _DCT_CACHE[cols] = _build_dct_matrix(cols)
+    return _DCT_CACHE[rows] @ pixels @ _DCT_CACHE[cols].T
@@ -1,18 +1,31 @@
 import os
-import traceback
 import re
 import time
+import logging
 import collections
+import heapq
 import random
-from typing import Optional, Tuple
+import sqlite3
+import threading
+import multiprocessing
+import numpy as np
+from typing import Optional, Tuple, Union, Iterator, List, Set, Dict, NamedTuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from zoneinfo import ZoneInfo
 from enum import Enum
-from datetime import datetime
+from datetime import datetime, timedelta
 from dataclasses import dataclass
 import instaloader
 from source.logging_modules import CustomLogger
-from source.database_modules import DatabaseConnection, DatabaseManager
-from source.hash_modules import HashCalculator
+from source.database_modules import DatabaseConnection, DatabaseManager, IMAGE_INSERT_COLUMNS, VIDEO_INSERT_COLUMNS
+from source.hash_modules import (
+        HashCalculator,
+        FileHashCache,
+        FileHashes,
+        ImageHashes,
+        LEGACY_HASH_ALGORITHMS,
+        init_hash_worker,
+        calculate_image_hash_worker)
 from source.fingerprint_modules import VideoFingerprinter
 from source.yolo_modules import YoloProvider
 from instaloader import (
@@ -88,6 +101,28 @@ SLEEP_REQUESTS = 0
 
 LONG_PAUSE_WAIT_MIN = 30  # 30 seconds minimum for long pauses
 LONG_PAUSE_WAIT_MAX = 300  # 5 minutes maximum for long pauses
+JITTER_POOL_SIZE = 1024  # Uniform [0, 1) samples drawn per refill of the rate limiter's jitter pool
+ERROR_RESET_QUERIES = 10  # Queries admitted without a new error before the consecutive-error counters reset
+
+REVERSE_SCAN_BATCH = 100  # Files per existence query / batched insert when reverse-loading a directory
+PRE_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)  # Threads used to list directories in the pre-scan
+PRE_SCAN_PARALLEL_MIN_SUBDIRS = 4  # Only go parallel when the base directory has more subdirectories than this
+DOWNLOAD_WORKERS = 4  # Posts downloaded concurrently; Instagram starts rate-limiting beyond a few
+DOWNLOAD_INSERT_BATCH = 50  # Downloaded files buffered across posts per existence query / batched insert
+HASH_IO_WORKERS = 8  # Files of a batch hashed concurrently so their disk reads overlap
+IMAGE_HASH_PROCESSES = os.cpu_count() or 1  # Worker processes for perceptual hashes (CPU-bound, GIL-held)
+BLAKE3_EXISTS_CACHE_SIZE = 100_000  # blake3 -> exists-in-DB entries kept (LRU) to skip repeated lookups
+
+_SEP_DOT = os.sep + '.'  # Markers of a path that abspath would still normalize ("/./", "/../", "//")
+_SEP_SEP = os.sep * 2
+
+# Reverse-scan filename priorities in one pass; the alternatives cannot both match at the end
+# of a name, so the leftmost match is also the highest priority:
+#   p1: Instagram "{date:%Y%m%d_%H%M%S}_{shortcode}" at the start of the name
+#   p2: ".../20181105_113442_gojoonhee_2.jpg"
+#   p4: "... (1).jpg" copies (no match at all is priority 3)
+_RE_PRIORITY = re.compile(r'(?P<p1>^\d{8}_\d{6}_\w+)|(?P<p2>\d{8}_\d{6}_\w+_\d+\.\w+$)|(?P<p4>\(\d+\)\.\w+$)')
+_PRIORITY_BY_GROUP = {'p1': 1, 'p2': 2, 'p4': 4}
 
 class TimeBasedRateLimit(Enum):
     """ Rate Limits for different time periods """
@@ -104,6 +139,9 @@ class TimeBasedRateLimit(Enum):
 class RateController(instaloader.RateController):
     """Custom rate controller for Instaloader to manage request rates"""
 
+    # Common log prefix; hot-path messages use lazy %-style args on top of it
+    _PFX = "[bright_black][RateLimiter]🚦[/bright_black]"
+
     def __init__(self, context, timezone="Asia/Seoul", logger=None):
         super().__init__(context)
 
@@ -129,19 +167,31 @@ class RateController(instaloader.RateController):
 
         # Set the timezone for time-based rate limiting
         self.timezone = ZoneInfo(timezone)
+        # The time band is a pure function of the hour, so precompute all 24
+        self._hour_band = tuple(self._compute_band(h) for h in range(24))
+
+        # Time of the last request on the time.monotonic() clock
+        self.last_request_time = float('-inf')
 
-        # For rate tracking
-        self.minute_request_times = collections.deque(maxlen=MAX_REQUESTS_PER_MINUTE)
-        self.hourly_request_times = collections.deque(maxlen=MAX_REQUESTS_PER_HOUR)
-        self.daily_request_times = collections.deque(maxlen=MAX_REQUESTS_PER_DAY)
-        self.weekly_request_times = collections.deque(maxlen=MAX_REQUESTS_PER_WEEK)
-        self.monthly_request_times = collections.deque(maxlen=MAX_REQUESTS_PER_MONTH)
-        self.last_request_time = 0.0
+        # Serializes wait_before_query and the error handlers' counter/limit updates across
+        # download threads (reentrant, so a handler may call back into locked helpers)
+        self._lock = threading.RLock()
 
-        # Error handling counters
+        # Error handling counters; reset after ERROR_RESET_QUERIES error-free queries, not on every
+        # admitted query, since with several download threads those are mostly other threads' queries
         self.consecutive_429_errors = 0
         self.consecutive_403_errors = 0
         self.consecutive_500_errors = 0
+        self._queries_since_error = 0
+        # time.monotonic() until which further 429s don't lower the hourly limit again
+        # (one burst seen by several threads counts as a single decrease)
+        self._limit_hold_until = float('-inf')
+        # Queries admitted since the last 429 or hourly-limit increase (see _wait_before_query)
+        self._queries_since_increase = 0
+
+        # Pre-sampled uniform [0, 1) values for the per-query jitter (see _rand)
+        self._rng = np.random.default_rng()
+        self._jitter_pool = iter(())
 
         # Human-like pause logic
         self.posts_since_pause = 0
@@ -149,9 +199,28 @@ class RateController(instaloader.RateController):
 
         # Set the daily request limit based on the specified range
         self.daily_request_limit = random.randint(DAILY_LIMIT_REQUEST_MIN, DAILY_LIMIT_REQUEST_MAX)
+
+        # For rate tracking: token buckets for the minute and day on the time.monotonic() clock.
+        # Each holds up to its limit and refills at limit/window (see _refill)
+        self._tokens_min = float(MAX_REQUESTS_PER_MINUTE)
+        self._tokens_day = float(self.daily_request_limit)
+        self._last_refill = time.monotonic()
+        # The hour uses a sliding-window counter (see _hourly_count): requests in the current
+        # and previous fixed hour, weighted by how much of the previous hour still overlaps
+        self._hour_window_start = self._last_refill
+        self._hour_prev = 0
+        self._hour_curr = 0
         self.logger.info(f"[bright_black][RateLimiter]🚦[/bright_black] RateController initialized with daily limit: {self.daily_request_limit} requests")
 
     def wait_before_query(self, query_type: str):
+        """
+        Called by Instaloader before each request. Posts are downloaded from several threads,
+        so queries are admitted one at a time; see _wait_before_query.
+        """
+        with self._lock:
+            self._wait_before_query(query_type)
+
+    def _wait_before_query(self, query_type: str):
         """
         Called by Instaloader before each request.
         Implements:
@@ -160,115 +229,175 @@ class RateController(instaloader.RateController):
         3. Per-minute, per-hour, per-day limits
         4. Human-like pauses between posts
         """
-        now = time.time()
-        current_datetime = datetime.now(self.timezone)
+        # Reset the error counters once enough queries went through without a new error
+        self._queries_since_error += 1
+        if self._queries_since_error >= ERROR_RESET_QUERIES:
+            self._reset_error_counters()
 
-        # Reset error counters on successful requests
-        self.consecutive_429_errors = 0
-        self.consecutive_403_errors = 0
-        self.consecutive_500_errors = 0
+        # 1. Time-based rate control (re-evaluated after waking from the sleep period)
+        while True:
+            current_datetime = datetime.now(self.timezone)
+            time_period, min_req, max_req = self._get_time_based_rate_control(current_datetime)
 
-        # 1. Time-based rate control
-        time_period, min_req, max_req = self._get_time_based_rate_control(current_datetime)
+            # If we're in sleep time, wait until the end of sleep period
+            if time_period == TimeBasedRateLimit.SLEEP:
+                sleep_hours_end = SLEEP_END
+                current_hour = current_datetime.hour
 
-        # If we're in sleep time, wait until the end of sleep period
-        if time_period == TimeBasedRateLimit.SLEEP:
-            sleep_hours_end = SLEEP_END
-            current_hour = current_datetime.hour
+                if current_hour < sleep_hours_end:
+                    # Calculate seconds until SLEEP_END hour
+                    wait_seconds = (sleep_hours_end - current_hour) * SECONDS_IN_HOUR
+                    # Subtract already elapsed minutes and seconds
+                    wait_seconds -= (current_datetime.minute * SECONDS_IN_MINUTE + current_datetime.second)
 
-            if current_hour < sleep_hours_end:
-                # Calculate seconds until SLEEP_END hour
-                wait_seconds = (sleep_hours_end - current_hour) * SECONDS_IN_HOUR
-                # Subtract already elapsed minutes and seconds
-                wait_seconds -= (current_datetime.minute * SECONDS_IN_MINUTE + current_datetime.second)
+                    self.logger.info("%s Sleep time period. Waiting until %d:00 AM - %d minutes, %d seconds", self._PFX, sleep_hours_end, wait_seconds // 60, wait_seconds % 60)
+                    self._sleep(wait_seconds)
+                    continue  # Retry after sleep
+            break
 
-                self.logger.info(f"[bright_black][RateLimiter]🚦[/bright_black] Sleep time period. Waiting until {sleep_hours_end}:00 AM - {wait_seconds // 60} minutes, {wait_seconds % 60} seconds")
-                self._sleep(wait_seconds)
-                return self.wait_before_query(query_type)  # Retry after sleep
+        now = started = time.monotonic()
 
-        # 2. Apply per-minute limit
-        if len(self.minute_request_times) >= max_req:
-            oldest_req = self.minute_request_times[0]
-            elapsed = now - oldest_req
-
-            if elapsed < SECONDS_IN_MINUTE:
-                wait_time = SECONDS_IN_MINUTE - elapsed
-                self.logger.info(f"[bright_black][RateLimiter]🚦[/bright_black] Per-minute limit reached. Waiting {wait_time:.2f}s")
-                self._sleep(wait_time)
-                now = time.time()
-
-        # 3. Apply per-hour limit
-        if len(self.hourly_request_times) >= self.max_requests_per_hour:
-            oldest_hr_req = self.hourly_request_times[0]
-            elapsed_hr = now - oldest_hr_req
-
-            if elapsed_hr < SECONDS_IN_HOUR:
-                wait_time = SECONDS_IN_HOUR - elapsed_hr
-                self.logger.info(f"[bright_black][RateLimiter]🚦[/bright_black] Hourly limit reached ({self.max_requests_per_hour}/hr). Waiting {wait_time:.0f}s")
-                self._sleep(wait_time)
-                now = time.time()
+        # 2-5. Per-minute, per-hour and per-day limits, then the minimum interval
+        now = self._apply_request_limits(now, max_req)
 
-        # 4. Apply daily limit
-        if len(self.daily_request_times) >= self.daily_request_limit:
-            # Clean up old entries from more than 24 hours ago
-            while self.daily_request_times and (now - self.daily_request_times[0] > SECONDS_IN_DAY):
-                self.daily_request_times.popleft()
+        # 6. Human-like random "long break" between posts
+        if query_type in ["get_feed_posts", "get_profile", "get_post_page", "get_igtv_page"]:
+            self.posts_since_pause += 1
+
+            if self.posts_since_pause >= self.posts_until_next_pause:
+                # Take a longer pause after a certain number of posts
+                long_pause = self._uniform(LONG_PAUSE_WAIT_MIN, LONG_PAUSE_WAIT_MAX)
+                self.logger.info("%s Taking a human-like break after %d posts. Pausing for %.1fs", self._PFX, self.posts_since_pause, long_pause)
+                self._sleep(long_pause)
+
+                # Reset the post counter and randomize the next pause
+                self.posts_since_pause = 0
+                self.posts_until_next_pause = self._randint(self.posts_before_wait_min, self.posts_before_wait_max)
+
+                now = time.monotonic()
+
+        # 7. Take one token from each bucket and record the request time
+        # ('now' is refreshed after every sleep above)
+        self._tokens_min -= 1.0
+        self._hour_curr += 1
+        self._tokens_day -= 1.0
+        self.last_request_time = now
+
+        # AIMD additive increase: win back one request per hour for every full window
+        # (max_requests_per_hour admitted queries) without a 429, up to the configured limit
+        self._queries_since_increase += 1
+        if self._queries_since_increase >= self.max_requests_per_hour:
+            self._queries_since_increase = 0
+            if self.max_requests_per_hour < MAX_REQUESTS_PER_HOUR:
+                self.max_requests_per_hour += 1
+
+        # Log the query being made (wall-clock time derived from the reads above, not a fresh one)
+        if self.logger.isEnabledFor(logging.INFO):
+            executed_at = current_datetime + timedelta(seconds=now - started)
+            self.logger.info("%s Executing query '%s' at %s", self._PFX, query_type, executed_at.strftime('%H:%M:%S'))
+
+    def _refill(self, now: float, max_req: int) -> None:
+        """
+        Credit every bucket for the time since the last refill, capped at its capacity.
+        The per-minute capacity follows the current time band (max_req).
+        """
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens_min = min(float(max_req), self._tokens_min + elapsed * max_req / SECONDS_IN_MINUTE)
+        self._tokens_day = min(float(self.daily_request_limit),
+                               self._tokens_day + elapsed * self.daily_request_limit / SECONDS_IN_DAY)
+
+    def _hourly_count(self, now: float) -> float:
+        """
+        Sliding-window estimate of the requests in the last hour: roll the fixed hour windows
+        forward to 'now', then weight the previous hour by its remaining overlap.
+        """
+        elapsed = (now - self._hour_window_start) / SECONDS_IN_HOUR
+        if elapsed >= 1.0:
+            # One full hour later the current window becomes the previous one; after two, both are empty
+            self._hour_prev = self._hour_curr if elapsed < 2.0 else 0
+            self._hour_curr = 0
+            self._hour_window_start += SECONDS_IN_HOUR * int(elapsed)
+            elapsed -= int(elapsed)
+        return self._hour_prev * (1.0 - elapsed) + self._hour_curr
+
+    def _apply_request_limits(self, now: float, max_req: int) -> float:
+        """
+        Steps 2-5 of wait_before_query: sleep until the per-minute and per-day buckets each
+        hold a token and the hourly sliding window has room, then for the jittered minimum interval.
+        Returns the refreshed current time.
+        """
+        self._refill(now, max_req)
 
-            if len(self.daily_request_times) >= self.daily_request_limit:
-                oldest_daily = self.daily_request_times[0]
-                elapsed_daily = now - oldest_daily
+        # 2. Apply per-minute limit
+        if self._tokens_min < 1.0:
+            wait_time = (1.0 - self._tokens_min) * SECONDS_IN_MINUTE / max_req
+            self.logger.info("%s Per-minute limit reached. Waiting %.2fs", self._PFX, wait_time)
+            self._sleep(wait_time)
+            now = time.monotonic()
+            self._refill(now, max_req)
+
+        # 3. Apply per-hour limit (no burst at the hour boundary: the previous hour still counts)
+        hourly_count = self._hourly_count(now)
+        while hourly_count >= self.max_requests_per_hour:
+            wait_time = (hourly_count - self.max_requests_per_hour + 1) / self.max_requests_per_hour * SECONDS_IN_HOUR
+            self.logger.info("%s Hourly limit reached (%d/hr). Waiting %.0fs", self._PFX, self.max_requests_per_hour, wait_time)
+            self._sleep(wait_time)
+            now = time.monotonic()
+            self._refill(now, max_req)
+            hourly_count = self._hourly_count(now)
 
-                if elapsed_daily < SECONDS_IN_DAY:
-                    wait_time = SECONDS_IN_DAY - elapsed_daily
-                    self.logger.info(f"[bright_black][RateLimiter]🚦[/bright_black] Daily limit of {self.daily_request_limit} reached. Waiting {wait_time / SECONDS_IN_HOUR:.1f} hours")
-                    self._sleep(wait_time)
-                    now = time.time()
+        # 4. Apply daily limit
+        if self._tokens_day < 1.0:
+            wait_time = (1.0 - self._tokens_day) * SECONDS_IN_DAY / self.daily_request_limit
+            self.logger.info("%s Daily limit of %d reached. Waiting %.1f hours", self._PFX, self.daily_request_limit, wait_time / SECONDS_IN_HOUR)
+            self._sleep(wait_time)
+            now = time.monotonic()
+            self._refill(now, max_req)
 
         # 5. Minimum interval + random jitter
         elapsed = now - self.last_request_time
         min_interval = 60.0 / max_req  # Minimum seconds between requests
-        jitter = random.uniform(0, min_interval * 0.5)  # Up to 50% random jitter
+        jitter = self._rand() * min_interval * 0.5  # Up to 50% random jitter
 
         min_interval_with_jitter = min_interval + jitter
 
         if elapsed < min_interval_with_jitter:
             wait_time = min_interval_with_jitter - elapsed
-            self.logger.info(f"[bright_black][RateLimiter]🚦[/bright_black] Applying minimum interval. Waiting {wait_time:.2f}s")
+            self.logger.info("%s Applying minimum interval. Waiting %.2fs", self._PFX, wait_time)
             self._sleep(wait_time)
-            now = time.time()
-
-        # 6. Human-like random "long break" between posts
-        if query_type in ["get_feed_posts", "get_profile", "get_post_page", "get_igtv_page"]:
-            self.posts_since_pause += 1
-
-            if self.posts_since_pause >= self.posts_until_next_pause:
-                # Take a longer pause after a certain number of posts
-                long_pause = random.uniform(LONG_PAUSE_WAIT_MIN, LONG_PAUSE_WAIT_MAX)
-                self.logger.info(f"[bright_black][RateLimiter]🚦[/bright_black] Taking a human-like break after {self.posts_since_pause} posts. Pausing for {long_pause:.1f}s")
-                self._sleep(long_pause)
+            now = time.monotonic()
 
-                # Reset the post counter and randomize the next pause
-                self.posts_since_pause = 0
-                self.posts_until_next_pause = random.randint(self.posts_before_wait_min, self.posts_before_wait_max)
+        return now
 
-                now = time.time()
+    def _rand(self) -> float:
+        """Return the next uniform [0, 1) sample, refilling the pool in blocks of JITTER_POOL_SIZE."""
+        try:
+            return next(self._jitter_pool)
+        except StopIteration:
+            self._jitter_pool = iter(self._rng.random(JITTER_POOL_SIZE).tolist())
+            return next(self._jitter_pool)
 
-        # 7. Record the request time in all tracking deques
-        current_time = time.time()
-        self.minute_request_times.append(current_time)
-        self.hourly_request_times.append(current_time)
-        self.daily_request_times.append(current_time)
-        self.weekly_request_times.append(current_time)
-        self.monthly_request_times.append(current_time)
-        self.last_request_time = current_time
+    def _uniform(self, low: float, high: float) -> float:
+        """random.uniform(low, high) drawn from the pre-sampled pool."""
+        return low + self._rand() * (high - low)
 
-        # Log the query being made
-        self.logger.info(f"[bright_black][RateLimiter]🚦[/bright_black] Executing query '{query_type}' at {datetime.now(self.timezone).strftime('%H:%M:%S')}")
+    def _randint(self, low: int, high: int) -> int:
+        """random.randint(low, high) (both inclusive) drawn from the pre-sampled pool."""
+        return min(high, low + int(self._rand() * (high - low + 1)))
 
     def _get_time_based_rate_control(self, current_time: datetime) -> Tuple[TimeBasedRateLimit, int, int]:
         """
         Determine rate limits based on time of day.
-        Returns a tuple of (time_period, min_requests, max_requests)
+        Returns a tuple of (time_period, min_requests, max_requests) from the per-hour
+        lookup table built in __init__ (see _compute_band for the bands).
+        """
+        return self._hour_band[current_time.hour]
+
+    @staticmethod
+    def _compute_band(hour: int) -> Tuple[TimeBasedRateLimit, int, int]:
+        """
+        Map an hour (0-23) to its (time_period, min_requests, max_requests) band.
 
         Time periods:
         - Early Morning (5am-8am): 5-10 requests per minute
@@ -278,8 +407,6 @@ class RateController(instaloader.RateController):
         - Late Night (10pm-12am): 20-80 requests per minute
         - Sleep (12am-5am): 0 requests per minute (sleep mode)
         """
-        hour = current_time.hour
-
         if SLEEP_START <= hour < SLEEP_END:
             # Sleep time (12am-5am): No requests
             return TimeBasedRateLimit.SLEEP, 0, 0
@@ -304,18 +431,24 @@ class RateController(instaloader.RateController):
             # Late night (10pm-12am): Moderate-high rate
             return TimeBasedRateLimit.LATE_NIGHT, LATE_NIGHT_MIN_REQUESTS, LATE_NIGHT_MAX_REQUESTS
 
-    def handle_200(self, query_type: str):
-        """Handle successful request (HTTP 200) - reset error counters"""
+    def _reset_error_counters(self) -> None:
+        """Clear the consecutive-error counters (callers hold self._lock)."""
         self.consecutive_429_errors = 0
         self.consecutive_403_errors = 0
         self.consecutive_500_errors = 0
-        self.logger.info(f"[bright_black][RateLimiter]🚦[/bright_black] Request '{query_type}' succeeded with 200 OK")
+        self._queries_since_error = 0
+
+    def handle_200(self, query_type: str):
+        """Handle successful request (HTTP 200) - reset error counters"""
+        with self._lock:
+            self._reset_error_counters()
+        self.logger.info("%s Request '%s' succeeded with 200 OK", self._PFX, query_type)
 
     def handle_400(self, query_type: str):
         """Handle Bad Request (HTTP 400) - client-side error"""
         self.logger.warning(f"Bad request (400) for '{query_type}'. This is usually a client-side error.")
         # Implement a small delay
-        wait_time = random.uniform(1.0, 3.0)
+        wait_time = self._uniform(1.0, 3.0)
         self.logger.warning(f"[bright_black][RateLimiter]🚦[/bright_black] Waiting {wait_time:.2f}s after 400 error")
         self._sleep(wait_time)
 
@@ -323,72 +456,104 @@ class RateController(instaloader.RateController):
         """Handle Unauthorized (HTTP 401) - auth issues"""
         self.logger.warning(f"[bright_black][RateLimiter]🚦[/bright_black] Unauthorized (401) for '{query_type}'. Authentication issue detected.")
         # Suggest login or re-authentication
-        wait_time = random.uniform(5.0, 10.0)
+        wait_time = self._uniform(5.0, 10.0)
         self.logger.warning(f"[bright_black][RateLimiter]🚦[/bright_black] Waiting {wait_time:.2f}s after 401 error")
         self._sleep(wait_time)
 
     def handle_403(self, query_type: str):
         """Handle Forbidden (HTTP 403) - may indicate account actions needed"""
-        self.consecutive_403_errors += 1
-        backoff_secs = self.initial_backoff_factor * (BACKOFF_FACTOR ** (self.consecutive_403_errors - 1))
+        with self._lock:
+            self.consecutive_403_errors += 1
+            self._queries_since_error = 0
+            attempt = self.consecutive_403_errors
 
-        # Cap the maximum backoff time to 2 hours
-        backoff_secs = min(backoff_secs, 7200)
+        # Full-jitter backoff, capped at 2 hours
+        backoff_secs = self._jittered_backoff(self.initial_backoff_factor, BACKOFF_FACTOR, attempt, 7200)
 
         self.logger.error(f"[bright_black][RateLimiter]🚦[/bright_black] Forbidden (403) for '{query_type}'. This may indicate account actions required.")
-        self.logger.warning(f"[bright_black][RateLimiter]🚦[/bright_black] Consecutive 403 errors: {self.consecutive_403_errors}. Backing off for {backoff_secs:.1f}s")
+        self.logger.warning(f"[bright_black][RateLimiter]🚦[/bright_black] Consecutive 403 errors: {attempt}. Backing off for {backoff_secs:.1f}s")
         self._sleep(backoff_secs)
 
     def handle_404(self, query_type: str):
         """Handle Not Found (HTTP 404) - resource doesn't exist"""
         self.logger.error(f"[bright_black][RateLimiter]🚦[/bright_black] Not found (404) for '{query_type}'. The requested resource doesn't exist.")
         # Minimal waiting for 404s as they're expected sometimes
-        wait_time = random.uniform(1.0, 2.0)
+        wait_time = self._uniform(1.0, 2.0)
         self._sleep(wait_time)
 
     def handle_429(self, query_type: str):
         """Handle Too Many Requests (HTTP 429) - rate limiting"""
-        self.consecutive_429_errors += 1
-        backoff_secs = self.initial_backoff_factor * (BACKOFF_FACTOR ** (self.consecutive_429_errors - 1))
-
-        # Cap the maximum backoff time to 4 hours
-        backoff_secs = min(backoff_secs, 14400)
+        with self._lock:
+            self.consecutive_429_errors += 1
+            self._queries_since_error = 0
+            attempt = self.consecutive_429_errors
+            self._queries_since_increase = 0
+            window = self._backoff_window(self.initial_backoff_factor, BACKOFF_FACTOR, attempt, 14400)
+
+            # AIMD: halve the hourly limit so it settles just under what the server tolerates,
+            # instead of running into ever longer backoffs at the configured rate. At most once
+            # per backoff window, so the other threads' 429s from the same burst don't compound it
+            now = time.monotonic()
+            if now >= self._limit_hold_until:
+                self.max_requests_per_hour = max(self.min_requests_per_hour, self.max_requests_per_hour // 2)
+                self._limit_hold_until = now + window
+            hourly_limit = self.max_requests_per_hour
+
+        # Full-jitter backoff, capped at 4 hours
+        backoff_secs = random.uniform(0, window)
 
         self.logger.warning(f"[bright_black][RateLimiter]🚦[/bright_black] Rate limit (429) for '{query_type}'. This indicates we're sending too many requests.")
-        self.logger.warning(f"[bright_black][RateLimiter]🚦[/bright_black] Consecutive 429 errors: {self.consecutive_429_errors}. Backing off for {backoff_secs:.1f}s")
+        self.logger.warning(f"[bright_black][RateLimiter]🚦[/bright_black] Consecutive 429 errors: {attempt}. Hourly limit now {hourly_limit}. Backing off for {backoff_secs:.1f}s")
         self._sleep(backoff_secs)
 
     def handle_500(self, query_type: str):
         """Handle Server Error (HTTP 500) - Instagram server issue"""
-        self.consecutive_500_errors += 1
+        with self._lock:
+            self.consecutive_500_errors += 1
+            self._queries_since_error = 0
+            attempt = self.consecutive_500_errors
 
-        # For server errors, use a more gradual backoff
-        backoff_secs = 5.0 * (BACKOFF_FACTOR ** (self.consecutive_500_errors - 1))
-        backoff_secs = min(backoff_secs, 3600)  # Cap at 1 hour
+        # For server errors, use a more gradual full-jitter backoff, capped at 1 hour
+        backoff_secs = self._jittered_backoff(5.0, BACKOFF_FACTOR, attempt, 3600)
 
         self.logger.warning(f"[bright_black][RateLimiter]🚦[/bright_black] Server error (500) for '{query_type}'. This is an Instagram server issue.")
-        self.logger.warning(f"[bright_black][RateLimiter]🚦[/bright_black] Consecutive 500 errors: {self.consecutive_500_errors}. Backing off for {backoff_secs:.1f}s")
+        self.logger.warning(f"[bright_black][RateLimiter]🚦[/bright_black] Consecutive 500 errors: {attempt}. Backing off for {backoff_secs:.1f}s")
         self._sleep(backoff_secs)
 
     def handle_soft_block(self, query_type: str, message: str):
         """
         Handle soft blocks from Instagram (usually in 400 responses with specific messages).
-        Implements exponential backoff for repeated blocks.
+        Implements full-jitter exponential backoff for repeated blocks.
         """
         self.logger.info(f"[bright_black][RateLimiter]🚦[/bright_black] Soft block detected for '{query_type}': {message}")
 
         # For soft blocks, implement a very conservative backoff
         base_backoff = 1800  # 30 minutes
         factor = 1.5
-        self.consecutive_403_errors += 1  # Use the 403 counter for soft blocks too
+        with self._lock:
+            self.consecutive_403_errors += 1  # Use the 403 counter for soft blocks too
+            self._queries_since_error = 0
+            attempt = self.consecutive_403_errors
 
-        backoff_secs = base_backoff * (factor ** (self.consecutive_403_errors - 1))
-        # Cap at 8 hours max
-        backoff_secs = min(backoff_secs, 28800)
+        # Full-jitter backoff, capped at 8 hours
+        backoff_secs = self._jittered_backoff(base_backoff, factor, attempt, 28800)
 
         self.logger.info(f"[bright_black][RateLimiter]🚦[/bright_black] Soft block backoff: sleeping for {backoff_secs / 60:.1f} minutes")
         self._sleep(backoff_secs)
 
+    @staticmethod
+    def _backoff_window(base: float, factor: float, attempt: int, cap: float) -> float:
+        """Upper end of the exponential backoff for this attempt: min(cap, base * factor**(attempt-1))."""
+        return min(cap, base * (factor ** (attempt - 1)))
+
+    @classmethod
+    def _jittered_backoff(cls, base: float, factor: float, attempt: int, cap: float) -> float:
+        """
+        "Full jitter" exponential backoff: a uniform draw from [0, _backoff_window(...)].
+        Randomizing the whole window keeps concurrent fetchers from retrying in lockstep.
+        """
+        return random.uniform(0, cls._backoff_window(base, factor, attempt, cap))
+
     def sleep(self, secs: float):
         """Called by Instaloader in some situations."""
         self.logger.warning(f"[bright_black][RateLimiter]🚦[/bright_black] Sleeping {secs:.2f}s by Instaloader's request")
@@ -397,13 +562,11 @@ class RateController(instaloader.RateController):
     def _sleep(self, secs: float):
         """Unified place for all sleeps with KeyboardInterrupt handling."""
         try:
-            # Ensure minimum sleep time and round to 2 decimals for logging clarity
+            # Ensure minimum sleep time (rounding is left to the log format)
             secs = max(secs, 0.1)
-            secs = round(secs, 2)
 
-            if secs > 60:
-                mins = secs / 60
-                self.logger.warning(f"[bright_black][RateLimiter]🚦[/bright_black] Sleeping for {mins:.1f} minutes")
+            if secs > 60 and self.logger.isEnabledFor(logging.WARNING):
+                self.logger.warning("%s Sleeping for %.1f minutes", self._PFX, secs / 60)
 
             time.sleep(secs)
         except KeyboardInterrupt:
@@ -429,6 +592,9 @@ class RateController(instaloader.RateController):
 # ------------------------------
 @dataclass
 class BasicFileInfo:
+    # One instance per scanned file: slots drop the per-instance __dict__
+    # (declared by hand, as dataclass(slots=True) needs Python 3.10)
+    __slots__ = ('path', 'filename', 'directory', 'extension', 'file_type', 'file_size')
     path: str
     filename: str
     directory: str
@@ -436,25 +602,59 @@ class BasicFileInfo:
     file_type: str
     file_size: int
 
+class DirMediaStats(NamedTuple):
+    """Per-directory media counts for the pre-scan breakdown."""
+    images: int
+    videos: int
+    total: int
+
 # ------------------------------
 # External Variables
 # ------------------------------
-image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.heic', '.heif']
-video_extensions = ['.mp4', '.mov', '.avi', '.wmv', '.mkv', '.flv', '.webm', '.m4v', '.3gp', '.mpg', '.mpeg']
-others_extensions = ['.json', '.xz', '.json.xz', '.txt', '.csv', '.zip', '.rar', '.7z', '.iso', '.dmg']
+image_extensions = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.heic', '.heif'})
+video_extensions = frozenset({'.mp4', '.mov', '.avi', '.wmv', '.mkv', '.flv', '.webm', '.m4v', '.3gp', '.mpg', '.mpeg'})
+others_extensions = frozenset({'.json', '.xz', '.json.xz', '.txt', '.csv', '.zip', '.rar', '.7z', '.iso', '.dmg'})
+
+# Extension (without the dot, lowercase) -> file type. Compound suffixes such as
+# .json.xz resolve through their final component ('xz' -> 'other').
+EXT_TYPE = {e.lstrip('.'): 'other' for e in others_extensions}
+EXT_TYPE.update({e.lstrip('.'): 'video' for e in video_extensions})
+EXT_TYPE.update({e.lstrip('.'): 'image' for e in image_extensions})
 
 class InstagramFetcher:
-    def __init__(self, logger, hash_calculator: HashCalculator, yolo_provider: YoloProvider, video_fingerprinter: VideoFingerprinter, skip_database: bool = False):
+    # Common log prefix; per-file messages use lazy %-style args on top of it
+    _PFX = "[bright_black][Fetcher]📸[/bright_black]"
+
+    def __init__(self, logger, hash_calculator: HashCalculator, yolo_provider: YoloProvider, video_fingerprinter: VideoFingerprinter, skip_database: bool = False, hash_cache: Optional[FileHashCache] = None, compute_legacy_hashes: bool = True, download_workers: int = DOWNLOAD_WORKERS):
         self.logger = logger
         self.hash_calculator = hash_calculator
+        self.hash_cache = hash_cache
+        # BLAKE3 alone gates insertion; MD5/SHA256/SHA512 are only stored for reference,
+        # so they are computed after the existence check, for new files only
+        self.compute_legacy_hashes = compute_legacy_hashes
         self.yolo_provider = yolo_provider
         self.video_fingerprinter = video_fingerprinter
         self.skip_database = skip_database
+        # Posts downloaded at once; 1 restores strictly sequential downloads
+        self.download_workers = max(1, download_workers)
+        # Level check for the per-file INFO logs, done once instead of per file
+        self._log_info = self.logger.isEnabledFor(logging.INFO)
+        # blake3 -> exists-in-DB, LRU-evicted at BLAKE3_EXISTS_CACHE_SIZE entries
+        self._blake3_exists_cache = collections.OrderedDict()
+        # Created on first use by _calculate_image_hashes; shut down by close()
+        self._image_hash_pool: Optional[ProcessPoolExecutor] = None
+
+    def close(self) -> None:
+        """Shut down the image-hash worker processes, if any were started."""
+        if self._image_hash_pool is not None:
+            self._image_hash_pool.shutdown()
+            self._image_hash_pool = None
         
     def reset_table(self, table_name: str, db_connection: DatabaseConnection, db_manager: DatabaseManager) -> None:
         if db_connection and db_manager:
             try:
                 db_manager.reset_table(db_connection.connection, table_name)
+                self._blake3_exists_cache.clear()
                 self.logger.info(f"[bright_black][Fetcher]📸[/bright_black][bold green] Table '{table_name}' reset successfully.[/bold green]")
             except Exception as e:
                 self.logger.error(f"[bright_black][Fetcher]📸[/bright_black] Failed to reset table {table_name}: {e}")
@@ -468,16 +668,26 @@ class InstagramFetcher:
 
             if os.path.isfile(session_file_path):
                 loader.load_session_from_file(username, session_file_path)
-                self.logger.info(f"[bright_black][Fetcher]📸[/bright_black][bold magenta] Reusing session for[/bold magenta] [bold green]{username}[/bold green].")
-                return True
-            
-            else:
-                self.logger.info(f"[bright_black][Fetcher]📸[/bright_black][bold yellow]No saved session, logging in as {username}...[/bold yellow]")
-                password = getpass(prompt=f"[bright_black][Fetcher]📸[/bright_black]Instagram password for {username}: ")
-                loader.login(username, password)
-                loader.save_session_to_file(session_file_path)
-                self.logger.info(f"[bright_black][Fetcher]📸[/bright_black][bold green]Saved session to {session_file_path}.[/bold green]")
-                return True
+                # Probe the saved session now, while prompting for a password is still cheap,
+                # instead of hitting a login wall halfway through the downloads
+                try:
+                    session_user = loader.test_login()
+                except ConnectionException as e:
+                    # Couldn't check (e.g. 429): keep the saved session rather than give up on it
+                    self.logger.warning(f"[bright_black][Fetcher]📸[/bright_black][bold yellow] Could not verify the saved session for {username}, reusing it anyway:[/bold yellow] {e}")
+                    return True
+                if session_user is not None:
+                    self.logger.info(f"[bright_black][Fetcher]📸[/bright_black][bold magenta] Reusing session for[/bold magenta] [bold green]{username}[/bold green].")
+                    return True
+                self.logger.warning(f"[bright_black][Fetcher]📸[/bright_black][bold yellow] Saved session for {username} has expired.[/bold yellow]")
+                self._delete_session_for_relogin(username)
+
+            self.logger.info(f"[bright_black][Fetcher]📸[/bright_black][bold yellow]No saved session, logging in as {username}...[/bold yellow]")
+            password = getpass(prompt=f"[bright_black][Fetcher]📸[/bright_black]Instagram password for {username}: ")
+            loader.login(username, password)
+            loader.save_session_to_file(session_file_path)
+            self.logger.info(f"[bright_black][Fetcher]📸[/bright_black][bold green]Saved session to {session_file_path}.[/bold green]")
+            return True
         
         except BadCredentialsException:
             self.logger.error("[bright_black][Fetcher]📸[/bright_black][bold red]Login failed: Bad username or password.[/bold red]")
@@ -511,14 +721,52 @@ class InstagramFetcher:
         skipped_count = 0
         error_count = 0
         
+        # Define a function to determine priority (lower number = higher priority)
+        def _get_priority(filename):
+            match = _RE_PRIORITY.search(filename)
+            # Pattern 3: Files that DON'T have (1).jpg at the end (and no Instagram name)
+            if match is None:
+                return 3
+            # Pattern 1 (Instagram format), 2 (suffixed Instagram format) or 4 (everything else)
+            return _PRIORITY_BY_GROUP[match.lastgroup]
+
+        # One traversal feeds both the pre-scan statistics and the file list below. It is consumed
+        # as it goes: media files land straight in per-priority buckets (index = priority), each held
+        # once as a single path string, and the statistics keep one count row per media directory.
+        # There are only four priorities, so this stable bucket pass replaces a sort.
+        buckets = [[] for _ in range(5)]
+        dir_counts = []
+
+        try:
+            for root, image_count, video_count, files in self._walk_media_counts(base_directory, collect_files=True):
+                if image_count or video_count:
+                    dir_counts.append((root, image_count, video_count))
+                # Only the extension decides whether a file is kept, so classify by name and
+                # leave the stat to the batch insert (kept files only)
+                for entry in files:
+                    file_path, filename = entry.path, entry.name
+                    file_type = self._file_type_of(filename)
+                    # Skip non-media files
+                    if file_type not in ('image', 'video'):
+                        skipped_count += 1
+                        self.logger.debug("%s Skipping non-media file: %s (type=%s)", self._PFX, file_path, file_type)
+                        continue
+                    
+                    buckets[_get_priority(filename)].append(file_path)
+        except Exception as e:
+            self.logger.critical(f"[bright_black][Fetcher]📸[/bright_black] Critical error during directory scan: {e}", exc_info=True)
+            return 0
+
         if display_stats:
-            self._display_pre_scan_stats(base_directory)
+            self._display_pre_scan_stats(base_directory, dir_counts)
+        del dir_counts
 
         if reset_table:
             self.logger.info(f"[bright_black][Fetcher]📸[/bright_black] Resetting table {table_name} before scanning...")
             
             try:
                 db_manager.reset_table(db_connection.connection, table_name)
+                self._blake3_exists_cache.clear()
                 self.logger.info(f"[bright_black][Fetcher]📸[/bright_black] Table {table_name} reset successfully.")
             
             except Exception as e:
@@ -526,71 +774,45 @@ class InstagramFetcher:
                 return 0
 
         self.logger.info(f"[bright_black][Fetcher]📸[/bright_black] Scanning directory for reverse load: {base_directory}")
-        
-        # First, collect all media files
-        all_files = []
 
-        try:
-            for root, _, files in os.walk(base_directory):
-                for filename in files:
-                    file_path = os.path.join(root, filename)
-                    file_info = self._extract_file_components(file_path)
-                    
-                    # Skip non-media files
-                    if file_info.file_type not in ['image', 'video']:
-                        skipped_count += 1
-                        self.logger.debug(f"[bright_black][Fetcher]📸[/bright_black] Skipping non-media file: {file_path} (type={file_info.file_type})")
-                        continue
-                    
-                    all_files.append((file_path, filename))
-        except Exception as e:
-            self.logger.critical(f"[bright_black][Fetcher]📸[/bright_black] Critical error during directory scan: {e}\n{traceback.format_exc()}")
-            return 0
-        
-        # Define a function to determine priority (lower number = higher priority)
-        def _get_priority(filename):
-            # Pattern 1: Instagram format "{date:%Y%m%d_%H%M%S}_{shortcode}"
-            if re.match(r'\d{8}_\d{6}_\w+', filename):
-                return 1
-            
-            # Pattern 2: Format like ".../20181105_113442_gojoonhee_2.jpg"
-            if re.match(r'.*\d{8}_\d{6}_\w+_\d+\.\w+$', filename):
-                return 2
-            
-            # Pattern 3: Files that DON'T have (1).jpg at the end
-            if not re.search(r'\(\d+\)\.\w+$', filename):
-                return 3
-            
-            # Pattern 4: Everything else
-            return 4
+        total_files = sum(len(bucket) for bucket in buckets)
+        self.logger.info(f"[bright_black][Fetcher]📸[/bright_black] Processing {total_files} files in priority order...")
         
-        # Sort files by priority
-        self.logger.info(f"[bright_black][Fetcher]📸[/bright_black] Sorting {len(all_files)} files by priority pattern...")
-        sorted_files = sorted(all_files, key=lambda x: _get_priority(x[1]))
-        
-        # Now process files in order of priority
-        for idx, (file_path, _) in enumerate(sorted_files, 1):
-            file_count += 1
-            
-            # Log with priority information
-            priority = _get_priority(os.path.basename(file_path))
-            self.logger.info(f"[bright_black][Fetcher]📸[/bright_black] Processing file {idx}/{len(sorted_files)} (Priority {priority}): {file_path}")
-            
+        def _flush(batch: List[str]) -> None:
+            # One existence query + one batched insert per REVERSE_SCAN_BATCH files
+            nonlocal processed_count, error_count
             try:
-                # Process and insert the media file
-                self._insert_media(table_name, db_connection, db_manager, file_path)
-                processed_count += 1
-                
-                # Add a small delay to prevent database overload
-                time.sleep(0.1)
+                self._insert_media_batch(table_name, db_connection, db_manager, batch)
+                processed_count += len(batch)
             except Exception as e:
-                error_count += 1
-                self.logger.error(f"[bright_black][Fetcher]📸[/bright_black] Database insert error for {file_path}: {e}\n{traceback.format_exc()}")
-                continue
-            
-            # Progress log for every 100 files
-            if idx % 100 == 0:
-                self.logger.info(f"[bright_black][Fetcher]📸[/bright_black] Progress: {idx}/{len(sorted_files)} files processed, {processed_count} successful, {error_count} errors")
+                error_count += len(batch)
+                self.logger.error(f"[bright_black][Fetcher]📸[/bright_black] Database insert error for batch of {len(batch)} files ending at {batch[-1]}: {e}", exc_info=True)
+            batch.clear()
+
+        # Now process files in order of priority, releasing each bucket once it is done
+        idx = 0
+        batch = []
+        for priority, bucket in enumerate(buckets):
+            for file_path in bucket:
+                idx += 1
+                file_count += 1
+                
+                # Log with priority information
+                if self._log_info:
+                    self.logger.info("%s Processing file %d/%d (Priority %d): %s", self._PFX, idx, total_files, priority, file_path)
+                
+                batch.append(file_path)
+                if len(batch) >= REVERSE_SCAN_BATCH:
+                    _flush(batch)
+                
+                # Progress log for every 100 files
+                if idx % 100 == 0:
+                    self.logger.info(f"[bright_black][Fetcher]📸[/bright_black] Progress: {idx}/{total_files} files processed, {processed_count} successful, {error_count} errors")
+            bucket.clear()
+
+        # Flush the final partial batch
+        if batch:
+            _flush(batch)
         
         self.logger.info(f"[bright_black][Fetcher]📸[/bright_black] Reverse load completed. Total files found: {file_count}, Media files processed: {processed_count}, Errors: {error_count}, Skipped: {skipped_count}")
         return processed_count
@@ -654,17 +876,18 @@ class InstagramFetcher:
         
         except Exception as e:
             self.logger.error(
-                f"[bright_black][Fetcher]📸[/bright_black] Unexpected error processing posts for '{profile_name}': {e}\n"
-                f"{traceback.format_exc()}"
+                f"[bright_black][Fetcher]📸[/bright_black] Unexpected error processing posts for '{profile_name}': {e}",
+                exc_info=True
             )
 
     ##############################################################################################################################
     # Private Methods
     ##############################################################################################################################
-    def _display_pre_scan_stats(self, base_directory: str) -> None:
+    def _display_pre_scan_stats(self, base_directory: str, dir_counts: Optional[List[Tuple[str, int, int]]] = None) -> None:
         """
         Gathers and logs statistics about media files before processing.
         Shows counts of images and videos in each subdirectory.
+        :param dir_counts: (directory, image_count, video_count) rows if the caller already walked the tree
         """
         total_dirs = 0
         total_image_count = 0
@@ -677,34 +900,15 @@ class InstagramFetcher:
         
         try:
             # First, collect stats by directory
-            for root, dirs, files in os.walk(base_directory):
-                # Skip hidden directories or system directories
-                dirs[:] = [d for d in dirs if not d.startswith('.') and not d.startswith('$')]
-                
+            if dir_counts is None:
+                dir_counts = ((root, image_count, video_count) for root, image_count, video_count, _ in self._walk_media_counts(base_directory))
+            for root, image_count, video_count in dir_counts:
                 rel_path = os.path.relpath(root, start=base_directory)
                 if rel_path == '.':
                     rel_path = "(root)"
-                    
-                image_count = 0
-                video_count = 0
-                
-                for filename in files:
-                    # Skip hidden files
-                    if filename.startswith('.') or filename.startswith('~'):
-                        continue
-                        
-                    ext = os.path.splitext(filename)[1].lower()
-                    if ext in image_extensions:
-                        image_count += 1
-                    elif ext in video_extensions:
-                        video_count += 1
                 
                 if image_count > 0 or video_count > 0:
-                    dir_stats[rel_path] = {
-                        'images': image_count,
-                        'videos': video_count,
-                        'total': image_count + video_count
-                    }
+                    dir_stats[rel_path] = DirMediaStats(image_count, video_count, image_count + video_count)
                     total_image_count += image_count
                     total_video_count += video_count
                     total_dirs += 1
@@ -719,21 +923,23 @@ class InstagramFetcher:
             # Sort directories by total file count and print details
             if dir_stats:
                 self.logger.info("\n[bold green]DIRECTORY BREAKDOWN:[/bold green]")
-                sorted_dirs = sorted(dir_stats.items(), key=lambda x: x[1]['total'], reverse=True)
+                # Limit to top 20 directories if there are many; only those need ordering
+                if len(dir_stats) > 25:
+                    sorted_dirs = heapq.nlargest(20, dir_stats.items(), key=lambda x: x[1].total)
+                else:
+                    sorted_dirs = sorted(dir_stats.items(), key=lambda x: x[1].total, reverse=True)
                 
                 for i, (dir_path, stats) in enumerate(sorted_dirs, 1):
                     self.logger.info(
                         f"{i:2d}. [bold white]{dir_path}:[/bold white] "
-                        f"[blue]Images: {stats['images']:,}[/blue] | "
-                        f"[cyan]Videos: {stats['videos']:,}[/cyan] | "
-                        f"Total: {stats['total']:,}"
+                        f"[blue]Images: {stats.images:,}[/blue] | "
+                        f"[cyan]Videos: {stats.videos:,}[/cyan] | "
+                        f"Total: {stats.total:,}"
                     )
-                    
-                    # Limit to top 20 directories if there are many
-                    if i >= 20 and len(sorted_dirs) > 25:
-                        remaining = len(sorted_dirs) - i
-                        self.logger.info(f"   ... and {remaining} more directories")
-                        break
+
+                remaining = len(dir_stats) - len(sorted_dirs)
+                if remaining:
+                    self.logger.info(f"   ... and {remaining} more directories")
                         
             self.logger.info("=" * 100)
             self.logger.info("📸 [bold green]Pre-scan completed. Starting file processing...[/bold green]")
@@ -741,8 +947,92 @@ class InstagramFetcher:
             
         except Exception as e:
             self.logger.error(f"[bright_black][Fetcher]📸[/bright_black] Error collecting pre-scan statistics: {e}")
-            self.logger.debug(traceback.format_exc())
+            self.logger.debug("[bright_black][Fetcher]📸[/bright_black] Pre-scan statistics traceback", exc_info=True)
             
+    def _walk_media_counts(self, base_directory: str, collect_files: bool = False) -> Iterator[Tuple[str, int, int, List[os.DirEntry]]]:
+        """
+        Yield (directory, image_count, video_count, files) for base_directory and every directory under it.
+        Directory listings are syscall-latency bound, so subdirectories are scanned on a thread pool
+        when the base directory has more than PRE_SCAN_PARALLEL_MIN_SUBDIRS of them.
+        With collect_files, files holds a DirEntry for every regular file and hidden directories are
+        walked too (with zero counts), so one traversal serves both the stats and reverse_scan.
+        Without it, files is empty and hidden directories are skipped.
+        """
+        result = self._scan_one_dir(base_directory, True, collect_files)
+        if result is None:
+            return
+        image_count, video_count, subdirs, files = result
+        yield base_directory, image_count, video_count, files
+
+        if len(subdirs) <= PRE_SCAN_PARALLEL_MIN_SUBDIRS:
+            # Small tree: a plain breadth-first walk avoids the threading overhead
+            pending = collections.deque(subdirs)
+            while pending:
+                directory, counted = pending.popleft()
+                result = self._scan_one_dir(directory, counted, collect_files)
+                if result is None:
+                    continue
+                image_count, video_count, subdirs, files = result
+                yield directory, image_count, video_count, files
+                pending.extend(subdirs)
+            return
+
+        with ThreadPoolExecutor(max_workers=PRE_SCAN_WORKERS) as executor:
+            futures = {executor.submit(self._scan_one_dir, d, counted, collect_files): d for d, counted in subdirs}
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    directory = futures.pop(future)
+                    result = future.result()
+                    if result is None:
+                        continue
+                    image_count, video_count, subdirs, files = result
+                    yield directory, image_count, video_count, files
+                    for subdir, counted in subdirs:
+                        futures[executor.submit(self._scan_one_dir, subdir, counted, collect_files)] = subdir
+
+    @staticmethod
+    def _scan_one_dir(path: str, counted: bool = True, collect_files: bool = False) -> Optional[Tuple[int, int, List[Tuple[str, bool]], List[os.DirEntry]]]:
+        """
+        List a single directory with os.scandir.
+        Returns (image_count, video_count, subdirectories, files), or None if the directory can't be read.
+        subdirectories are (path, counted) pairs. Hidden/system directories ('.', '$') and hidden files
+        ('.', '~') are not counted; hidden directories are only returned (as uncounted) with collect_files.
+        With counted=False (inside a hidden directory) nothing is counted.
+        """
+        image_count = 0
+        video_count = 0
+        subdirs = []
+        files = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    name = entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if not name.startswith(('.', '$')):
+                            subdirs.append((entry.path, counted))
+                        elif collect_files:
+                            subdirs.append((entry.path, False))
+                        continue
+
+                    if not entry.is_file():
+                        continue
+                    if collect_files:
+                        files.append(entry)
+                    if not counted or name.startswith(('.', '~')):
+                        continue
+
+                    # Leading dots were skipped above, so rpartition matches splitext here
+                    _, dot, ext = name.rpartition('.')
+                    file_type = EXT_TYPE.get(ext.lower()) if dot else None
+                    if file_type == 'image':
+                        image_count += 1
+                    elif file_type == 'video':
+                        video_count += 1
+        except OSError:
+            return None
+        return image_count, video_count, subdirs, files
+
     def _download_and_process_posts(
         self,
         L: Instaloader,
@@ -755,8 +1045,9 @@ class InstagramFetcher:
         limit: int = None
     ) -> None:
         """
-        Retrieves the profile's posts, handles 'challenge_required', and downloads each post
-        with up to 3 retries on ConnectionException. Then processes inserted media in the DB.
+        Retrieves the profile's posts, handles 'challenge_required', and downloads the posts
+        download_workers at a time with up to 3 retries each on ConnectionException.
+        Then processes inserted media in the DB as each post completes.
         Consolidates what used to be scattered among multiple try/except blocks.
         """
         try:
@@ -798,57 +1089,107 @@ class InstagramFetcher:
                 else:
                     raise    
 
-            for post in post_list:
-                # 2) Retry logic for each post
-                download_success = False
-                for attempt in range(max_retries):
-                    try:
-                        L.download_post(post, target=save_to)
-                        current_media_count += 1
-                        download_success = True
-                        break  # If successful, break out of retry loop
-                    except ConnectionException as e:
-                        error_message = str(e).lower()
-                        self.logger.warning(
-                            f"[bright_black][Fetcher]📸[/bright_black] ConnectionException: {e} - Attempt {attempt+1}/{max_retries} failed."
-                        )
-                        
-                        # If it's a "410 Gone" error (content deleted or no longer available)
-                        if "410 gone" in error_message:
-                            self.logger.warning(
-                                f"[bright_black][Fetcher]📸[/bright_black] Post {post.shortcode} appears to be deleted (410 Gone). Skipping this post."
-                            )
-                            break  # Exit the retry loop for this post
-                        
-                        # If it's the last attempt and not a 410 error, log and continue
-                        if attempt == max_retries - 1:
-                            self.logger.error(
-                                f"[bright_black][Fetcher]📸[/bright_black] Failed to download post {post.shortcode} after {max_retries} attempts."
-                            )
-                            # Instead of raising, just continue to the next post
-                            # We don't raise here anymore
-
-                # Skip processing if download failed
-                if not download_success:
-                    self.logger.info(f"[bright_black][Fetcher]📸[/bright_black] Skipping processing for failed download: {post.shortcode}")
-                    continue
+            # Snapshot the files already on disk so that after each download only the new names are scanned.
+            # A post's files from an earlier run (e.g. one that crashed before inserting) are not downloaded
+            # again, so they are taken from the snapshot instead; the blake3 check in _insert_media_batch
+            # drops those that are already in the DB
+            final_download_directory = download_directory
+            seen_files = set(self._list_names(final_download_directory))
+            preexisting_files = set(seen_files)
+
+            # 2) Download up to self.download_workers posts at once; Instagram queries still pass one at a
+            # time through the rate controller, but the media transfers of different posts overlap.
+            # DB inserts stay on this thread, driven by completions, and are batched across posts.
+            post_iter = iter(post_list)
+            pending = {}
+            batch = []
+            try:
+                with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+                    while True:
+                        # Keep the pool full; 4) honor the optional limit: every in-flight post adds at least one
+                        # file, so stop submitting once those alone could reach it. Posts with several files
+                        # can still overshoot by up to download_workers - 1 posts (in-flight posts finish)
+                        while len(pending) < self.download_workers and (limit is None or file_count + len(pending) < limit):
+                            post = next(post_iter, None)
+                            if post is None:
+                                break
+                            pending[executor.submit(self._download_post, L, post, save_to, max_retries)] = post
+                        if not pending:
+                            break
 
-                # 3) Process newly downloaded files
-                final_download_directory = os.path.join(download_directory)
-                if os.path.isdir(final_download_directory):
-                    for file in os.listdir(final_download_directory):
-                        if post.shortcode in file:
-                            file_path = os.path.join(final_download_directory, file)
-                            self._insert_media(table_name, db_connection, db_manager, file_path)
-                            file_count += 1
-                            self.logger.info(f"[bright_black][Fetcher]📸[/bright_black][green] Total {file_count} files completed ({current_media_count}/{media_count})[/green]")
-                # 4) Honor optional limit
-                if limit is not None and file_count >= limit:
-                    break
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            post = pending.pop(future)
+
+                            # Skip processing if download failed
+                            if not future.result():
+                                self.logger.info("%s Skipping processing for failed download: %s", self._PFX, post.shortcode)
+                                continue
+                            current_media_count += 1
+
+                            # 3) Process newly downloaded files of this post (other posts may still be writing theirs)
+                            # Set difference against the snapshot first, so only new names get the substring test
+                            new_files = [file for file in set(self._list_names(final_download_directory)).difference(seen_files)
+                                         if post.shortcode in file]
+                            seen_files.update(new_files)
+                            old_files = [file for file in preexisting_files if post.shortcode in file]
+                            preexisting_files.difference_update(old_files)
+                            new_files = sorted(new_files + old_files)
+                            post_files = [os.path.join(final_download_directory, file) for file in new_files]
+                            if post_files:
+                                # One existence query + one batched insert per DOWNLOAD_INSERT_BATCH files
+                                batch.extend(post_files)
+                                if len(batch) >= DOWNLOAD_INSERT_BATCH:
+                                    self._insert_media_batch(table_name, db_connection, db_manager, batch)
+                                    batch.clear()
+                                file_count += len(post_files)
+                                self.logger.info("%s[green] Total %d files completed (%d/%s)[/green]", self._PFX, file_count, current_media_count, media_count)
+            finally:
+                # Files already on disk are inserted even if the run stops early
+                if batch:
+                    self._insert_media_batch(table_name, db_connection, db_manager, batch)
         except Exception as e:
             self.logger.error(f"[bright_black][Fetcher]📸[/bright_black] Error in download_and_process_posts: {e}")
             raise
 
+    def _download_post(self, L: Instaloader, post, save_to: str, max_retries: int) -> bool:
+        """
+        Download one post with up to max_retries attempts on ConnectionException.
+        Runs on the download pool; returns True if the post was downloaded.
+        """
+        for attempt in range(max_retries):
+            try:
+                L.download_post(post, target=save_to)
+                return True
+            except ConnectionException as e:
+                error_message = str(e).lower()
+                self.logger.warning(
+                    f"[bright_black][Fetcher]📸[/bright_black] ConnectionException: {e} - Attempt {attempt+1}/{max_retries} failed."
+                )
+                
+                # If it's a "410 Gone" error (content deleted or no longer available)
+                if "410 gone" in error_message:
+                    self.logger.warning(
+                        f"[bright_black][Fetcher]📸[/bright_black] Post {post.shortcode} appears to be deleted (410 Gone). Skipping this post."
+                    )
+                    return False
+                
+                # If it's the last attempt and not a 410 error, log and give up on this post
+                if attempt == max_retries - 1:
+                    self.logger.error(
+                        f"[bright_black][Fetcher]📸[/bright_black] Failed to download post {post.shortcode} after {max_retries} attempts."
+                    )
+        return False
+
+    @staticmethod
+    def _list_names(directory: str) -> List[str]:
+        """Entry names in directory, or [] if it does not exist (yet); one syscall, no isdir check."""
+        try:
+            with os.scandir(directory) as it:
+                return [entry.name for entry in it]
+        except FileNotFoundError:
+            return []
+
     def _retrieve_posts(self, L: Instaloader, profile_name: str) -> Tuple:
         """
         Retrieve the post generator for the given profile_name,
@@ -897,126 +1238,291 @@ class InstagramFetcher:
             os.makedirs(session_dir, exist_ok=True)
         return os.path.join(session_dir, f"session-{username}")
 
-    def _insert_media(
+    def _insert_media_batch(
         self,
         table_name: str,
         db_connection: DatabaseConnection,
         db_manager: DatabaseManager,
-        downloaded_file_path: str
-    ) -> None:
-
-        file_info = self._extract_file_components(downloaded_file_path)
-        file_path = file_info.path
-        file_type = file_info.file_type
-        file_name = file_info.filename
-        file_size = file_info.file_size
-        file_directory = file_info.directory
-        file_extension = file_info.extension
-
+        file_paths: List[str]
+    ) -> int:
+        """
+        Process a batch of files and insert the new ones in two round-trips:
+        1) BLAKE3 for every media file (cached or hashed)
+        2) one blake3 IN (...) lookup drops files already in the DB
+        3) image hashes / video fingerprints only for the new files
+        4) YOLO for all new images in batched inference calls
+        5) one batched INSERT per file type (images, videos)
+        Returns the number of rows inserted.
+        """
         if self.skip_database:
-            self.logger.debug(f"[bright_black][Fetcher]📸[/bright_black] --skip-database: not inserting {downloaded_file_path} into DB")
-            return
+            for downloaded_file_path in file_paths:
+                self.logger.debug("%s --skip-database: not inserting %s into DB", self._PFX, downloaded_file_path)
+            return 0
 
-        # 1) Skip early if it's not image or video
-        if file_type not in ['image', 'video']:
-            self.logger.debug(f"[bright_black][Fetcher]📸[/bright_black] Skipping non-media file: {file_path} (type={file_type})")
-            return
+        # 1) BLAKE3 for each media file
+        media = []
+        for downloaded_file_path in file_paths:
+            file_info = self._extract_file_components(downloaded_file_path)
 
-        #self.logger.info(f"[bright_black][Fetcher]📸[/bright_black][bright_blue] Processing file:[/bright_blue] {file_path}")
+            # Skip early if it's not image or video
+            if file_info.file_type not in ['image', 'video']:
+                self.logger.debug("%s Skipping non-media file: %s (type=%s)", self._PFX, file_info.path, file_info.file_type)
+                continue
+            media.append(file_info)
 
-        try:
-            # 2) Compute only file-level BLAKE3 first
-            file_hashes = self.hash_calculator.calculate_file_hash(file_path)
-            blake3 = file_hashes.blake3  # We'll use this to check DB
+        candidates = []
+        for file_info, result in zip(media, self._get_blake3_many([file_info.path for file_info in media])):
+            file_path = file_info.path
+            if isinstance(result, Exception):
+                self.logger.error(f"[bright_black][Fetcher]📸[/bright_black][bold red]🔄 Failed to process file {file_path}[/bold red]: {result}", exc_info=result)
+                continue
+            blake3 = result
             if not blake3:
                 self.logger.warning(f"[bright_black][Fetcher]📸[/bright_black] [yellow]Skipping (missing blake3)[/yellow]: {file_path}.")
-                return
+                continue
+            candidates.append((file_info, blake3))
 
-            # 3) Check if this BLAKE3 already exists in DB
-            if db_manager.exists_by_blake3(db_connection.connection, table_name, blake3):
-                # 'exists_by_blake3' is a custom method you'd implement in your db_manager
-                self.logger.info(f"[bright_black][Fetcher]📸[/bright_black] [yellow]Skipping (exists)[/yellow]: {file_path}")
-                return
+        if not candidates:
+            return 0
 
-            # 4) Not in DB → compute other hashes or YOLO if needed
-            md5 = file_hashes.md5
-            sha256 = file_hashes.sha256
-            sha512 = file_hashes.sha512
+        # 2) Check which BLAKE3s already exist in DB (cached answers first, one query for the rest)
+        existing = self._existing_blake3(table_name, db_connection, db_manager, [blake3 for _, blake3 in candidates])
 
-            # Initialize fields in case we skip or raise
-            dhash = phash = whash = chash = ahash = None
-            has_human = False
-            human_score = 0.0
-            human_count = 0
-            video_fingerprint = None
-            video_width = video_height = 0
-            video_length = 0.0
-            video_fps = 0.0
-            video_resolution = None
-
-            # 5) If it’s an image → do image hashing & YOLO
-            if file_type == 'image':
-                image_hashes = self.hash_calculator.calculate_image_hash(file_path)
-                dhash = image_hashes.dhash
-                phash = image_hashes.phash
-                whash = image_hashes.whash
-                chash = image_hashes.chash
-                ahash = image_hashes.ahash
-                # you have two different ways to check for human in image (one in local yolo model, and the other is yolo api)
-                # if --use-yolo-api is set, use yolo api
-                # yolo_result = self.yolo_provider.has_human(file_path, use_api=True)
-                # human_score = float(yolo_result.confidence)
-                # human_count = yolo_result.human_count
-                # if --use-yolo-api is not set, then yuse local yolo model
-                yolo_result = self.yolo_provider.has_human(file_path)
-                has_human = yolo_result.has_human
-                human_score = float(yolo_result.confidence)
-                human_count = yolo_result.human_count
-
-            # 6) If it’s a video → do fingerprinting
-            elif file_type == 'video':
-                vid_fp = self.video_fingerprinter.extract_fingerprint(file_path)
-                video_fingerprint = vid_fp.hex
-                video_width = vid_fp.width
-                video_height = vid_fp.height
-                video_length = vid_fp.length
-                video_fps = vid_fp.fps
-                video_resolution = vid_fp.resolution
-
-            # 7) Insert into DB
-            db_manager.insert(
-                connection=db_connection.connection,
-                table_name=table_name,
-                file_path=file_path,
-                file_size=file_size,
-                file_directory=file_directory,
-                file_name=file_name,
-                file_type=file_type,
-                file_extension=file_extension,
-                md5=md5,
-                sha256=sha256,
-                sha512=sha512,
-                blake3=blake3,
-                dhash=dhash,
-                phash=phash,
-                whash=whash,
-                chash=chash,
-                ahash=ahash,
-                has_human=has_human,
-                has_human_score=human_score,
-                has_human_count=human_count,
-                video_fingerprint=video_fingerprint,
-                video_width=video_width,
-                video_height=video_height,
-                video_length=video_length,
-                video_fps=video_fps,
-                video_resolution=video_resolution
+        # 3) Not in DB → compute other hashes or fingerprints
+        new_files = []
+        for file_info, blake3 in candidates:
+            if blake3 in existing:
+                if self._log_info:
+                    self.logger.info("%s [yellow]Skipping (exists)[/yellow]: %s", self._PFX, file_info.path)
+                continue
+            existing.add(blake3)  # The same content twice in one batch is inserted once
+            new_files.append((file_info, blake3))
+
+        image_hashes = self._calculate_image_hashes([file_info.path for file_info, _ in new_files if file_info.file_type == 'image'])
+        records = []
+        for file_info, blake3 in new_files:
+            try:
+                records.append(self._build_media_record(file_info, blake3, image_hashes.get(file_info.path)))
+            except Exception as e:
+                self.logger.error(f"[bright_black][Fetcher]📸[/bright_black][bold red]🔄 Failed to process file {file_info.path}[/bold red]: {e}", exc_info=True)
+
+        image_records = [record for record in records if record['file_type'] == 'image']
+        video_records = [record for record in records if record['file_type'] == 'video']
+
+        # 4) YOLO for the new images, batched instead of one inference per file
+        if image_records:
+            yolo_results = self.yolo_provider.has_human_batch([record['file_path'] for record in image_records])
+            for record, yolo_result in zip(image_records, yolo_results):
+                record['has_human'] = yolo_result.has_human
+                record['has_human_score'] = float(yolo_result.confidence)
+                record['has_human_count'] = yolo_result.human_count
+
+        # 5) Insert into DB, one batch per file type so each INSERT names only the columns it fills
+        inserted = (db_manager.insert_many(db_connection.connection, table_name, image_records, IMAGE_INSERT_COLUMNS)
+                    + db_manager.insert_many(db_connection.connection, table_name, video_records, VIDEO_INSERT_COLUMNS))
+        for record in records:
+            if inserted == len(records):
+                self._remember_blake3(record['blake3'], True)
+            else:
+                # Partial or failed batch: forget, so the next lookup asks the DB
+                self._blake3_exists_cache.pop(record['blake3'], None)
+        if records:
+            self.logger.info(f"[bright_black][Fetcher]📸[/bright_black][bold #FFA500]🎯 {inserted}/{len(records)} records inserted successfully into {table_name}.[/bold #FFA500]")
+        return inserted
+
+    def _existing_blake3(
+        self,
+        table_name: str,
+        db_connection: DatabaseConnection,
+        db_manager: DatabaseManager,
+        blake3_values: List[str]
+    ) -> Set[str]:
+        """
+        Return the subset of blake3_values already in the table. Values seen earlier in this run
+        are answered from the LRU cache; only the rest go to the DB, and their answers are cached.
+        """
+        cache = self._blake3_exists_cache
+        existing = set()
+        unknown = []
+        for blake3 in blake3_values:
+            exists = cache.get(blake3)
+            if exists is None:
+                unknown.append(blake3)
+                continue
+            cache.move_to_end(blake3)
+            if exists:
+                existing.add(blake3)
+
+        if unknown:
+            found = db_manager.existing_blake3(db_connection.connection, table_name, unknown)
+            for blake3 in unknown:
+                self._remember_blake3(blake3, blake3 in found)
+            existing |= found
+        return existing
+
+    def _remember_blake3(self, blake3: str, exists: bool) -> None:
+        """Record a blake3 existence answer, evicting the least recently used entry when full."""
+        cache = self._blake3_exists_cache
+        cache[blake3] = exists
+        cache.move_to_end(blake3)
+        if len(cache) > BLAKE3_EXISTS_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def _get_blake3_many(self, file_paths: List[str]) -> List[Union[Optional[str], Exception]]:
+        """
+        Return the BLAKE3 per file, or the exception raised for that file.
+        BLAKE3 comes from the (path, size, mtime) cache when the file is unchanged; otherwise
+        only the BLAKE3 is computed (the legacy digests wait for the existence check) and cached.
+        Cache access stays on this thread (sqlite), and a cache error only costs a rehash; uncached files are hashed on a thread pool so
+        their reads overlap, since mmap page-ins and hashlib updates run without the GIL.
+        """
+        results = [None] * len(file_paths)
+        stats = {}
+        misses = []
+        for i, file_path in enumerate(file_paths):
+            if self.hash_cache is not None:
+                try:
+                    st = os.stat(file_path)
+                except OSError as e:
+                    results[i] = e
+                    continue
+                try:
+                    blake3 = self.hash_cache.get(file_path, st.st_size, st.st_mtime_ns)
+                except sqlite3.Error as e:
+                    # The cache is only an optimisation: hash the file and don't try to store it
+                    self.logger.warning("%s[yellow] Hash cache lookup failed for %s[/yellow]: %s", self._PFX, file_path, e)
+                else:
+                    if blake3 is not None:
+                        results[i] = blake3
+                        continue
+                    stats[i] = st
+            misses.append(i)
+
+        def _hash(i: int) -> Union[FileHashes, Exception]:
+            try:
+                return self.hash_calculator.calculate_file_hash(file_paths[i], which=("blake3",))
+            except Exception as e:
+                return e
+
+        if len(misses) > 1:
+            with ThreadPoolExecutor(max_workers=min(HASH_IO_WORKERS, len(misses))) as executor:
+                hashed = list(executor.map(_hash, misses))
+        else:
+            hashed = [_hash(i) for i in misses]
+
+        for i, file_hashes in zip(misses, hashed):
+            if isinstance(file_hashes, Exception):
+                results[i] = file_hashes
+                continue
+            st = stats.get(i)
+            if file_hashes.blake3 and st is not None:
+                try:
+                    self.hash_cache.put(file_paths[i], st.st_size, st.st_mtime_ns, file_hashes.blake3)
+                except sqlite3.Error as e:
+                    self.logger.warning("%s[yellow] Hash cache update failed for %s[/yellow]: %s", self._PFX, file_paths[i], e)
+            results[i] = file_hashes.blake3
+        return results
+
+    def _calculate_image_hashes(self, file_paths: List[str]) -> Dict[str, Union[ImageHashes, Exception]]:
+        """
+        Perceptual hashes for several images on the worker process pool (imagehash holds the GIL).
+        Returns path -> ImageHashes, or the exception raised for that image. A single image is
+        left to _build_media_record, which hashes it in-process.
+        """
+        if len(file_paths) < 2 or IMAGE_HASH_PROCESSES < 2:
+            return {}
+        if self._image_hash_pool is None:
+            # spawn, not fork: the download threads may hold locks that a forked child would inherit locked
+            self._image_hash_pool = ProcessPoolExecutor(
+                max_workers=IMAGE_HASH_PROCESSES,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_hash_worker
             )
 
-            self.logger.info(f"[bright_black][Fetcher]📸[/bright_black][bold #FFA500]🎯 Record inserted successfully: {file_path} into {table_name}.[/bold #FFA500]")
+        results = {}
+        futures = {self._image_hash_pool.submit(calculate_image_hash_worker, file_path): file_path for file_path in file_paths}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                results[futures[future]] = e
+        return results
 
-        except Exception as e:
-            self.logger.error(f"[bright_black][Fetcher]📸[/bright_black][bold red]🔄 Failed to process file {file_path}[/bold red]: {e}\n\t{traceback.format_exc()}")
+    def _build_media_record(
+        self,
+        file_info: BasicFileInfo,
+        blake3: str,
+        image_hashes: Optional[Union[ImageHashes, Exception]] = None
+    ) -> dict:
+        """
+        Compute the remaining hashes or video fingerprint for a new file and return its DB record,
+        dispatching once on file_type. image_hashes may carry the result from _calculate_image_hashes.
+        """
+        record = self._build_base_record(file_info, blake3)
+        if file_info.file_type == 'image':
+            return self._build_image_record(record, image_hashes)
+        return self._build_video_record(record)
+
+    def _build_base_record(self, file_info: BasicFileInfo, blake3: str) -> dict:
+        """Fields shared by image and video records: file info and the file-level digests."""
+        file_path = file_info.path
+
+        md5 = sha256 = sha512 = None
+        if self.compute_legacy_hashes:
+            # The first pass (or the cache) only produced the BLAKE3; read the now known-new file
+            # once more for the legacy digests (usually from the page cache, as it was just hashed)
+            file_hashes = self.hash_calculator.calculate_file_hash(file_path, which=LEGACY_HASH_ALGORITHMS)
+            md5 = file_hashes.md5
+            sha256 = file_hashes.sha256
+            sha512 = file_hashes.sha512
+
+        return dict(
+            file_path=file_path,
+            file_size=file_info.file_size,
+            file_directory=file_info.directory,
+            file_name=file_info.filename,
+            file_type=file_info.file_type,
+            file_extension=file_info.extension,
+            md5=md5,
+            sha256=sha256,
+            sha512=sha512,
+            blake3=blake3
+        )
+
+    def _build_image_record(self, record: dict, image_hashes: Optional[Union[ImageHashes, Exception]]) -> dict:
+        """
+        Add the perceptual hashes to an image record. The YOLO fields start at their defaults;
+        _insert_media_batch fills them per batch.
+        """
+        if image_hashes is None:
+            image_hashes = self.hash_calculator.calculate_image_hash(record['file_path'])
+        elif isinstance(image_hashes, Exception):
+            raise image_hashes
+
+        record.update(
+            dhash=image_hashes.dhash,
+            phash=image_hashes.phash,
+            whash=image_hashes.whash,
+            chash=image_hashes.chash,
+            ahash=image_hashes.ahash,
+            has_human=False,
+            has_human_score=0.0,
+            has_human_count=0
+        )
+        return record
+
+    def _build_video_record(self, record: dict) -> dict:
+        """Add the video fingerprint and stream properties to a video record."""
+        vid_fp = self.video_fingerprinter.extract_fingerprint(record['file_path'])
+        record.update(
+            video_fingerprint=vid_fp.hex,
+            video_width=vid_fp.width,
+            video_height=vid_fp.height,
+            video_length=vid_fp.length,
+            video_fps=vid_fp.fps,
+            video_resolution=vid_fp.resolution
+        )
+        return record
 
     def _delete_session_for_relogin(self, username: str):
         session_file_path = self._get_default_session_filename(username)
@@ -1026,28 +1532,48 @@ class InstagramFetcher:
             return True
         return False
     
-    def _extract_file_components(self, file_path: str) -> BasicFileInfo:
-        """Extract file path components into BasicFileInfo."""
-        abs_path = os.path.abspath(file_path)
-        directory_path = os.path.dirname(abs_path)
-        filename = os.path.basename(abs_path)
-        basename, extension = os.path.splitext(filename)
-        extension = extension[1:] if extension.startswith('.') else extension
-        file_size = os.path.getsize(abs_path) if os.path.exists(abs_path) else 0
-
-        if abs_path.lower().endswith(tuple(image_extensions)):
-            file_type = 'image'
-        elif abs_path.lower().endswith(tuple(video_extensions)):
-            file_type = 'video'
-        elif abs_path.lower().endswith(tuple(others_extensions)):
-            file_type = 'other'
+    @staticmethod
+    def _abs_path(path: str) -> str:
+        """os.path.abspath, skipped for paths that are already absolute and normalized (the common case)."""
+        if os.path.isabs(path) and _SEP_DOT not in path and _SEP_SEP not in path:
+            return path
+        return os.path.abspath(path)
+
+    @staticmethod
+    def _extension_of(filename: str) -> str:
+        """Extension of filename without the dot; like splitext, '' for "name" or dot-files like ".profile"."""
+        stem, _, extension = filename.rpartition('.')
+        return extension if stem.strip('.') else ''
+
+    @classmethod
+    def _file_type_of(cls, filename: str) -> str:
+        """The file_type _extract_file_components would report, from the name alone (no stat)."""
+        return EXT_TYPE.get(cls._extension_of(filename).lower(), 'unknown')
+
+    def _extract_file_components(self, file_path: Union[str, os.DirEntry]) -> BasicFileInfo:
+        """
+        Extract file path components into BasicFileInfo.
+        Accepts a path or an os.DirEntry; for the latter the size comes from entry.stat().
+        """
+        if isinstance(file_path, os.DirEntry):
+            abs_path = self._abs_path(file_path.path)
+            file_size = file_path.stat().st_size
         else:
-            file_type = 'unknown'
+            abs_path = self._abs_path(file_path)
+            try:
+                file_size = os.stat(abs_path).st_size
+            except OSError:
+                file_size = 0
+        # One pass over the separators instead of dirname/basename/splitext/basename
+        directory_path, _, filename = abs_path.rpartition(os.sep)
+        extension = self._extension_of(filename)
+        directory = directory_path.rpartition(os.sep)[2]
+        file_type = EXT_TYPE.get(extension.lower(), 'unknown')
         
         return BasicFileInfo(
             path=abs_path,
             filename=filename,
-            directory=os.path.basename(directory_path),
+            directory=directory,
             extension=extension,
             file_type=file_type,
             file_size=file_size
@@ -1,11 +1,14 @@
 import os
-import torch
 import numpy as np
 import hashlib
 import cv2
 from dataclasses import dataclass
 from source.logging_modules import CustomLogger
 
+# Gaps (in frames) up to this are skipped with grab() instead of a seek: every seek restarts
+# decoding at the previous keyframe, which costs more than decoding a short run forward
+SEQUENTIAL_GRAB_MAX_GAP = 30
+
 @dataclass
 class VideoFileInfo:
     """Holds the computed fingerprint and key video metadata."""
@@ -27,23 +30,18 @@ class VideoFingerprinter:
     def __init__(
         self,
         fingerprint_length=1024,
-        use_gpu=True,
         frame_grid_size=16,
         scale_factor=8,
         frames_to_sample=None
     ):
         """
         :param fingerprint_length: Total bits in the resulting fingerprint.
-        :param use_gpu:           Whether to use GPU acceleration (if available).
         :param frame_grid_size:   Grid size for feature extraction (e.g. 16 => 16x16 cells).
         :param scale_factor:      Factor to downscale each frame before extraction.
         :param frames_to_sample:  Optional override for how many frames to sample (up to 16).
         """
         self.fingerprint_length = fingerprint_length
 
-        # Decide on device: GPU if available and requested, otherwise CPU
-        self.device = torch.device("cuda" if use_gpu and torch.cuda.is_available() else "cpu")
-
         # Grid-based feature extraction: each frame is split into frame_grid_size x frame_grid_size cells
         self.frame_grid_size = frame_grid_size
         self.bits_per_frame = self.frame_grid_size * self.frame_grid_size
@@ -60,11 +58,10 @@ class VideoFingerprinter:
         # Logging setup
         self.logger = CustomLogger(__name__).get_logger()
         self.logger.debug("VideoFingerprinter initialized with:")
-        self.logger.debug(f"  - Device: {self.device}")
-        self.logger.debug(f"  - Fingerprint length: {self.fingerprint_length} bits")
-        self.logger.debug(f"  - Grid size: {self.frame_grid_size}x{self.frame_grid_size}")
-        self.logger.debug(f"  - Scale factor: {self.scale_factor}")
-        self.logger.debug(f"  - Frames to sample: {self.frames_needed}")
+        self.logger.debug("  - Fingerprint length: %d bits", self.fingerprint_length)
+        self.logger.debug("  - Grid size: %dx%d", self.frame_grid_size, self.frame_grid_size)
+        self.logger.debug("  - Scale factor: %s", self.scale_factor)
+        self.logger.debug("  - Frames to sample: %d", self.frames_needed)
 
     def extract_fingerprint(self, video_path: str) -> VideoFileInfo:
         """
@@ -108,9 +105,18 @@ class VideoFingerprinter:
 
             # Read up to 5 frames for faster processing
             frames = []
+            position = 0  # Index of the frame the next read returns
             for idx in frame_indices[:min(5, len(frame_indices))]:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+                gap = idx - position
+                if 0 <= gap <= SEQUENTIAL_GRAB_MAX_GAP:
+                    # Close ahead: step forward without a seek (grab() skips the color conversion)
+                    for _ in range(gap):
+                        if not cap.grab():
+                            break
+                else:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
                 ret, frame = cap.read()
+                position = idx + 1
                 if ret:
                     # Resize frame to smaller size
                     small_frame = cv2.resize(
@@ -138,11 +144,9 @@ class VideoFingerprinter:
                     length=frame_count / fps
                 )
 
-            # Extract features: GPU if available, else CPU
-            if str(self.device) == 'cuda':
-                features = self._extract_features_gpu(frames)
-            else:
-                features = self._extract_features_simple(frames)
+            # Extract features: at most 5 small frames are sampled, so they are pooled on the CPU
+            # (a host<->device round trip would cost more than the pooling itself)
+            features = self._extract_features_simple(frames)
 
             # Convert features to binary
             binary_fingerprint = self._features_to_binary_simple(features)
@@ -177,140 +181,47 @@ class VideoFingerprinter:
         """Uniformly sample frames from the video, up to self.frames_needed total."""
         if frame_count <= self.frames_needed:
             return list(range(frame_count))
+        # Same indices as int(i * step) (float64 multiply, truncation toward zero), so stored
+        # fingerprints stay comparable; np.linspace would also hit the last frame and shift them
         step = frame_count / self.frames_needed
-        return [int(i * step) for i in range(self.frames_needed)]
+        return (np.arange(self.frames_needed) * step).astype(np.int64).tolist()
 
-    def _extract_features_simple(self, frames: list[np.ndarray]) -> list[list[float]]:
+    def _extract_features_simple(self, frames: list[np.ndarray]) -> np.ndarray:
         """
         CPU-based feature extraction. For each frame, compute the average
-        brightness in each cell of a grid, returning a list of features per frame.
+        brightness in each cell of a grid, returning one row of features per frame.
+        All frames share one size, so the cells of every frame are averaged in a
+        single reshaped mean instead of a Python loop per cell.
         """
-        features = []
-        for frame in frames:
-            h, w = frame.shape
-            cell_h = h // self.frame_grid_size
-            cell_w = w // self.frame_grid_size
-
-            grid_features = []
-            for i in range(self.frame_grid_size):
-                for j in range(self.frame_grid_size):
-                    cell = frame[i*cell_h:(i+1)*cell_h, j*cell_w:(j+1)*cell_w]
-                    avg = np.mean(cell)
-                    grid_features.append(avg)
-            features.append(grid_features)
-        return features
-
-    def _extract_features_gpu(self, frames: list[np.ndarray]) -> list[list[float]]:
+        if not frames:
+            return np.empty((0, self.frame_grid_size * self.frame_grid_size))
+        g = self.frame_grid_size
+        stack = np.stack(frames)
+        n, h, w = stack.shape
+        cell_h = h // g
+        cell_w = w // g
+        # (n, g, cell_h, g, cell_w): axes 2 and 4 run over the pixels of one cell, rows then columns
+        cells = stack[:, :g * cell_h, :g * cell_w].reshape(n, g, cell_h, g, cell_w)
+        return cells.mean(axis=(2, 4)).reshape(n, g * g)
+
+    def _features_to_binary_simple(self, features) -> np.ndarray:
         """
-        GPU-accelerated feature extraction using PyTorch.
-        Adaptively average-pools each frame to a grid, then extracts the cell means.
+        Convert feature arrays (one row per frame) to a binary fingerprint: a bit is set where
+        a cell is brighter than its frame's median. Returns fingerprint_length uint8 bits,
+        zero-padded or truncated.
         """
-        try:
-            batch_size = len(frames)
-            if batch_size == 0:
-                self.logger.debug("No frames to process with GPU.")
-                return []
-
-            # Dimensions from the first frame
-            h, w = frames[0].shape
-            cell_h = h // self.frame_grid_size
-            cell_w = w // self.frame_grid_size
-            if h <= 0 or w <= 0 or cell_h <= 0 or cell_w <= 0:
-                self.logger.warning(f"Invalid frame dimensions: {h}x{w}, falling back to CPU.")
-                return self._extract_features_simple(frames)
-
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-
-            # Create a batch tensor on the GPU
-            try:
-                batch_tensor = torch.zeros((batch_size, 1, h, w), dtype=torch.float32, device=self.device)
-            except Exception as e:
-                self.logger.warning(f"Failed to allocate GPU memory for batch tensor: {e}, falling back to CPU.")
-                return self._extract_features_simple(frames)
-
-            # Fill the batch tensor with frame data
-            for i, frame in enumerate(frames):
-                try:
-                    frame_tensor = torch.from_numpy(frame).float().unsqueeze(0)
-                    batch_tensor[i] = frame_tensor
-                except Exception as e:
-                    self.logger.warning(f"Failed to convert frame {i} to tensor: {e}, falling back to CPU.")
-                    return self._extract_features_simple(frames)
-
-            # Use adaptive pooling to get average cell values
-            adaptive_pool = torch.nn.AdaptiveAvgPool2d((self.frame_grid_size, self.frame_grid_size)).to(self.device)
-            pooled = adaptive_pool(batch_tensor)
-            # Flatten each frame's pooled grid
-            grid_features = pooled.view(batch_size, -1)
-
-            # Move results back to CPU
-            features = []
-            for i in range(batch_size):
-                frame_features = grid_features[i].cpu().numpy().tolist()
-                features.append(frame_features)
-
-            # Debug GPU usage
-            if torch.cuda.is_available():
-                self.logger.debug(f"GPU memory allocated: {torch.cuda.memory_allocated() / 1024**2:.2f} MB")
-                self.logger.debug(f"GPU memory cached: {torch.cuda.memory_reserved() / 1024**2:.2f} MB")
-
-            return features
-        except Exception as e:
-            import traceback
-            self.logger.warning(f"GPU feature extraction failed: {str(e)}. Falling back to CPU.")
-            self.logger.debug(f"GPU extraction traceback: {traceback.format_exc()}")
-            if torch.cuda.is_available():
-                try:
-                    torch.cuda.empty_cache()
-                except:
-                    pass
-            return self._extract_features_simple(frames)
-
-    def _features_to_binary_simple(self, features: list[list[float]]) -> list[int]:
+        bits = np.zeros(self.fingerprint_length, dtype=np.uint8)
+        feat = np.asarray(features, dtype=np.float64)
+        if feat.size:
+            frame_bits = (feat > np.median(feat, axis=1, keepdims=True)).ravel()
+            count = min(frame_bits.size, self.fingerprint_length)
+            bits[:count] = frame_bits[:count]
+        return bits
+
+    def _binary_to_hex_simple(self, binary: np.ndarray) -> str:
         """
-        Convert feature arrays to a binary fingerprint. By default,
-        if GPU is available, attempt a GPU approach; otherwise, do CPU.
+        Convert an array of bits (0/1) into a hex string by grouping each 8 bits into a byte
+        (bit i lands in byte i // 8 at position i % 8, hence the little bit order).
         """
-        if str(self.device) == 'cuda' and features and len(features) > 0:
-            try:
-                features_tensor = torch.tensor(features, dtype=torch.float32, device=self.device)
-                medians = torch.median(features_tensor, dim=1).values.unsqueeze(1)
-                binary_tensor = (features_tensor > medians).int()
-                binary = binary_tensor.view(-1).cpu().numpy().tolist()
-
-                # Ensure correct length
-                if len(binary) < self.fingerprint_length:
-                    binary.extend([0] * (self.fingerprint_length - len(binary)))
-                else:
-                    binary = binary[:self.fingerprint_length]
-                return binary
-            except Exception as e:
-                self.logger.warning(f"GPU binary conversion failed: {str(e)}. Falling back to CPU.")
-
-        # CPU fallback
-        binary = []
-        for frame_features in features:
-            median = np.median(frame_features)
-            frame_binary = [1 if f > median else 0 for f in frame_features]
-            binary.extend(frame_binary)
-
-        if len(binary) < self.fingerprint_length:
-            binary.extend([0] * (self.fingerprint_length - len(binary)))
-        else:
-            binary = binary[:self.fingerprint_length]
-
-        return binary
-
-    def _binary_to_hex_simple(self, binary: list[int]) -> str:
-        """
-        Convert a list of bits (0/1) into a hex string by grouping each 8 bits into a byte.
-        """
-        byte_count = (len(binary) + 7) // 8
-        byte_array = bytearray(byte_count)
-
-        for i, bit in enumerate(binary):
-            if bit:
-                byte_array[i // 8] |= 1 << (i % 8)
-
-        return byte_array.hex()
\ No newline at end of file
+        bits = np.asarray(binary, dtype=np.uint8)
+        return np.packbits(bits, bitorder='little').tobytes().hex()
@@ -1,18 +1,57 @@
 import os
+import mmap
 import hashlib
+import sqlite3
+from typing import Optional, Iterable
+import numpy as np
 from PIL import Image
 import imagehash
+try:
+    # pocketfft: the same unnormalized DCT-II as scipy.fftpack, with a multidimensional transform
+    import scipy.fft as scipy_fft
+except ImportError:
+    scipy_fft = None
 from source.logging_modules import CustomLogger
+
+try:
+    # Rust implementation with SIMD (AVX-512/AVX2/NEON) dispatch and optional multithreading
+    import blake3 as blake3_module
+except ImportError:
+    blake3_module = None
 from dataclasses import dataclass
 
 logger = CustomLogger(__name__).get_logger()
 
+try:
+    import _hashlib
+except ImportError:
+    _hashlib = None
+# SHA-NI and the vectorized MD5/SHA-512 kernels come from OpenSSL's CPUID dispatch; without
+# it hashlib falls back to CPython's portable (scalar) implementations
+HASHLIB_USES_OPENSSL = _hashlib is not None and hashlib.sha256 is getattr(_hashlib, "openssl_sha256", None)
+if not HASHLIB_USES_OPENSSL:
+    logger.warning("hashlib is not backed by OpenSSL; MD5/SHA256/SHA512 use the slower builtin implementations")
+
+# File-level digests calculate_file_hash knows how to compute
+FILE_HASH_ALGORITHMS = ("md5", "sha256", "sha512", "blake3")
+# The digests stored for reference only; BLAKE3 alone decides whether a file is new
+LEGACY_HASH_ALGORITHMS = ("md5", "sha256", "sha512")
+# JPEGs are decoded at a reduced scale (libjpeg DCT scaling) no smaller than this on either side;
+# the largest perceptual-hash resize is 4 * hash_size = 128 px, so this leaves ample detail
+IMAGE_HASH_DRAFT_SIZE = 512
+# Slice size for the single pass over a memory-mapped file
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+# Files at least this large are dropped from the page cache once hashed, so a rescan of a
+# multi-GB video library doesn't evict everything else; smaller files (images) stay cached
+# for the perceptual hash that usually follows
+HASH_DROP_CACHE_MIN_SIZE = 64 * 1024 * 1024
+
 @dataclass
 class FileHashes:
-    md5: str
-    sha256: str
-    sha512: str
-    blake3: str
+    md5: Optional[str]
+    sha256: Optional[str]
+    sha512: Optional[str]
+    blake3: Optional[str]
 
 @dataclass
 class ImageHashes:
@@ -22,13 +61,66 @@ class ImageHashes:
     chash: str
     ahash: str
 
+class FileHashCache:
+    """
+    A persistent (path, size, mtime_ns) -> BLAKE3 cache backed by SQLite, so re-scans
+    of unchanged files can skip reading them entirely.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        :param db_path: Path of the SQLite cache file (created if missing).
+        """
+        self.connection = sqlite3.connect(db_path)
+        # WAL keeps concurrent fetchers from blocking each other
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS file_hashes ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, blake3 TEXT NOT NULL)"
+        )
+        self.connection.commit()
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Optional[str]:
+        """Return the cached BLAKE3 for path if its size and mtime are unchanged, else None."""
+        row = self.connection.execute(
+            "SELECT blake3 FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, size, mtime_ns)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, path: str, size: int, mtime_ns: int, blake3: str) -> None:
+        """Store (or refresh) the BLAKE3 for path."""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, blake3) VALUES (?, ?, ?, ?)",
+            (path, size, mtime_ns, blake3)
+        )
+        self.connection.commit()
+
+    def close(self) -> None:
+        self.connection.close()
+
 class HashCalculator:
     """
     A class to calculate various hashes for files and images.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, native_blake3: bool = False):
+        """
+        :param native_blake3: Compute the 'blake3' digest with the native BLAKE3 binding instead of
+                              hashlib.blake2b. The digests differ, so only enable this for tables (and
+                              hash caches) built with it. SHA256/SHA512 always go through hashlib's
+                              OpenSSL backend, which uses SHA-NI where the CPU has it.
+        """
+        if native_blake3 and blake3_module is None:
+            raise ImportError("native_blake3 requires the 'blake3' package (pip install blake3)")
+        self.native_blake3 = native_blake3
+        # Name of the algorithm behind FileHashes.blake3 (e.g. to keep hash caches apart)
+        self.blake3_algorithm = "blake3" if native_blake3 else "blake2b"
+        if native_blake3:
+            self._blake3_factory = lambda: blake3_module.blake3(max_threads=blake3_module.blake3.AUTO)
+        else:
+            self._blake3_factory = hashlib.blake2b
 
     def calculate_all_hashes(self, filepath: str) -> tuple[FileHashes, ImageHashes]:
         """
@@ -45,23 +137,70 @@ class HashCalculator:
         image_hash = self.calculate_image_hash(filepath)
         return file_hash, image_hash
 
-    def calculate_file_hash(self, filepath: str) -> FileHashes:
+    def calculate_file_hash(self, filepath: str, which: Iterable[str] = FILE_HASH_ALGORITHMS) -> FileHashes:
         """
-        Calculate various hashes for a given file.
+        Calculate various hashes for a given file in a single streaming pass.
 
         Args:
             filepath (str): Path to the file to be hashed.
+            which (Iterable[str]): Subset of FILE_HASH_ALGORITHMS to compute; the others are None.
 
         Returns:
             FileHashes: An instance containing the MD5, SHA256, SHA512, and BLAKE3 hashes of the file.
         """
-        with open(filepath, "rb") as f:
-            data = f.read()
-        md5 = hashlib.md5(data).hexdigest()
-        sha256 = hashlib.sha256(data).hexdigest()
-        sha512 = hashlib.sha512(data).hexdigest()
-        blake3 = hashlib.blake2b(data).hexdigest()
-        return FileHashes(md5, sha256, sha512, blake3)
+        factories = {
+            "md5": hashlib.md5,
+            "sha256": hashlib.sha256,
+            "sha512": hashlib.sha512,
+            "blake3": self._blake3_factory,
+        }
+        hashers = {name: factories[name]() for name in which}
+        updates = [h.update for h in hashers.values()]
+
+        with open(filepath, "rb", buffering=0) as f:
+            fd = f.fileno()
+            size = os.fstat(fd).st_size
+            if size:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                try:
+                    mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    # Some network/FUSE mounts can't be mapped: stream through one reused buffer instead
+                    self._update_streaming(f, updates)
+                else:
+                    # Every selected hasher is fed zero-copy slices of the same mapping, so the
+                    # file is read once (hashlib releases the GIL while hashing large buffers)
+                    with mm, memoryview(mm) as view:
+                        for offset in range(0, size, HASH_CHUNK_SIZE):
+                            # Released even if an update raises, so closing the mapping can't mask the error
+                            with view[offset:offset + HASH_CHUNK_SIZE] as chunk:
+                                for update in updates:
+                                    update(chunk)
+                if size >= HASH_DROP_CACHE_MIN_SIZE and hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+        digests = {name: h.hexdigest() for name, h in hashers.items()}
+        return FileHashes(
+            md5=digests.get("md5"),
+            sha256=digests.get("sha256"),
+            sha512=digests.get("sha512"),
+            blake3=digests.get("blake3"),
+        )
+
+    @staticmethod
+    def _update_streaming(f, updates) -> None:
+        """Feed an unbuffered file to every hasher update in HASH_CHUNK_SIZE reads into a single buffer."""
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        with memoryview(buffer) as view:
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                with view[:n] as chunk:
+                    for update in updates:
+                        update(chunk)
 
     def calculate_image_hash(self, filepath: str, hash_size: int = 32) -> ImageHashes:
         """
@@ -78,24 +217,80 @@ class HashCalculator:
         """
         valid_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp', '.tiff', '.heic', '.heif', '.raw']
         
-        if not os.path.exists(filepath):
-            raise ValueError(f"File {filepath} does not exist")
-        
         if not any(filepath.lower().endswith(ext) for ext in valid_extensions):
             raise ValueError(f"File {filepath} is not an image")
 
         try:
             image = Image.open(filepath)
-            image.verify()
-            # Now reopen or copy the image for actual processing
-            image = Image.open(filepath)
-            image.load()  # optional: ensures full decode
+        except FileNotFoundError:
+            # Let open() report a missing file rather than stat'ing it up front
+            raise ValueError(f"File {filepath} does not exist")
         except Exception as e:
             raise Exception(f"Error opening image from {filepath}: {e}")
 
-        dhash = str(imagehash.dhash(image, hash_size))
-        phash = str(imagehash.phash(image, hash_size))
-        whash = str(imagehash.whash(image, hash_size))
-        chash = str(imagehash.colorhash(image, hash_size))
-        ahash = str(imagehash.average_hash(image, hash_size))
-        return ImageHashes(dhash, phash, whash, chash, ahash)
\ No newline at end of file
+        # Closing explicitly releases the handle multi-frame formats (GIF/WebP/TIFF) keep open after load()
+        with image:
+            try:
+                # Decode once (a full load() surfaces the same corruption verify() would), letting
+                # JPEGs decode straight to a smaller size instead of full resolution
+                image.draft('RGB', (IMAGE_HASH_DRAFT_SIZE, IMAGE_HASH_DRAFT_SIZE))
+                image.load()
+            except Exception as e:
+                raise Exception(f"Error opening image from {filepath}: {e}")
+
+            # dhash/phash/whash/ahash all start with convert("L"); do it once and share the result
+            gray = image.convert("L")
+            dhash = self._dhash(gray, hash_size)
+            phash = self._phash(gray, hash_size)
+            whash = str(imagehash.whash(gray, hash_size))
+            chash = str(imagehash.colorhash(image, hash_size))
+            ahash = self._average_hash(gray, hash_size)
+        return ImageHashes(dhash, phash, whash, chash, ahash)
+
+    # The reductions below match imagehash applied to the same decoded image bit for bit
+    # (same LANCZOS resize sizes, same comparisons, same hex layout)
+
+    @staticmethod
+    def _dhash(gray: Image.Image, hash_size: int) -> str:
+        """imagehash.dhash on an already-grayscale image: horizontal gradient of a (hash_size + 1) x hash_size downscale."""
+        pixels = np.asarray(gray.resize((hash_size + 1, hash_size), Image.LANCZOS))
+        return _bits_to_hex(pixels[:, 1:] > pixels[:, :-1])
+
+    @staticmethod
+    def _phash(gray: Image.Image, hash_size: int, highfreq_factor: int = 4) -> str:
+        """imagehash.phash on an already-grayscale image: low-frequency DCT block against its median."""
+        if scipy_fft is None:
+            return str(imagehash.phash(gray, hash_size, highfreq_factor))
+        img_size = hash_size * highfreq_factor
+        pixels = np.asarray(gray.resize((img_size, img_size), Image.LANCZOS), dtype=np.float64)
+        dct = scipy_fft.dctn(pixels, type=2)
+        low = dct[:hash_size, :hash_size]
+        return _bits_to_hex(low > np.median(low))
+
+    @staticmethod
+    def _average_hash(gray: Image.Image, hash_size: int) -> str:
+        """imagehash.average_hash on an already-grayscale image: hash_size x hash_size downscale against its mean."""
+        pixels = np.asarray(gray.resize((hash_size, hash_size), Image.LANCZOS))
+        return _bits_to_hex(pixels > pixels.mean())
+
+def _bits_to_hex(bits: np.ndarray) -> str:
+    """Hex string of a boolean hash, most significant bit first (the str(imagehash.ImageHash) format)."""
+    flat = bits.ravel()
+    if flat.size % 8:
+        # packbits would pad the last byte; let imagehash left-pad to whole nibbles instead
+        return str(imagehash.ImageHash(bits))
+    return np.packbits(flat).tobytes().hex()
+
+# ------------------------------
+# Process-pool workers
+# ------------------------------
+_worker_calculator: Optional[HashCalculator] = None
+
+def init_hash_worker() -> None:
+    """ProcessPoolExecutor initializer: build one HashCalculator per worker process."""
+    global _worker_calculator
+    _worker_calculator = HashCalculator()
+
+def calculate_image_hash_worker(filepath: str) -> ImageHashes:
+    """Process-pool entry point for HashCalculator.calculate_image_hash (see init_hash_worker)."""
+    return _worker_calculator.calculate_image_hash(filepath)
@@ -15,6 +15,8 @@ class CustomLogger:
     """
     _console_handler = None
     _file_handler = None
+    # Names of the loggers the shared handlers are already attached to
+    _configured_names = set()
 
     def __init__(self, name: str, level=logging.INFO):
         """
@@ -31,13 +33,12 @@ class CustomLogger:
         if CustomLogger._console_handler is None or CustomLogger._file_handler is None:
             self._initialize_handlers()
 
-        # Attach the console handler if not already attached
-        if not self._has_handler(CustomLogger._console_handler):
+        # Attach the shared handlers once per logger name; repeated CustomLogger(name)
+        # calls are a set lookup instead of a scan of the logger's handlers
+        if name not in CustomLogger._configured_names:
             self.logger.addHandler(CustomLogger._console_handler)
-
-        # Attach the file handler if not already attached
-        if not self._has_handler(CustomLogger._file_handler):
             self.logger.addHandler(CustomLogger._file_handler)
+            CustomLogger._configured_names.add(name)
 
     @staticmethod
     def _initialize_handlers():
@@ -71,10 +72,6 @@ class CustomLogger:
         CustomLogger._console_handler = console_handler
         CustomLogger._file_handler = file_handler
 
-    def _has_handler(self, handler: logging.Handler) -> bool:
-        """Check if the logger already has the specified handler."""
-        return any(h is handler for h in self.logger.handlers)
-
     def get_logger(self):
         """Return the configured logger instance."""
         return self.logger
\ No newline at end of file
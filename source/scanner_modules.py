@@ -1,15 +1,27 @@
 import re
-from typing import List, Callable
+import logging
+import collections
+import itertools
+import multiprocessing
+from typing import List, Callable, Optional, Iterator, Iterable, Tuple, Union, Set, Dict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, as_completed
 import os
+import sqlite3
 import traceback
-import time
 from datetime import datetime
 from dataclasses import dataclass
 import fnmatch  # for matching file patterns
 
 from source.logging_modules import CustomLogger
 from source.database_modules import DatabaseConnection, DatabaseManager
-from source.hash_modules import HashCalculator
+from source.hash_modules import (
+        HashCalculator,
+        FileHashCache,
+        FileHashes,
+        ImageHashes,
+        LEGACY_HASH_ALGORITHMS,
+        init_hash_worker,
+        calculate_image_hash_worker)
 from source.fingerprint_modules import VideoFingerprinter
 from source.yolo_modules import YoloProvider
 
@@ -18,6 +30,9 @@ from source.yolo_modules import YoloProvider
 # ------------------------------
 @dataclass
 class BasicFileInfo:
+    # One instance per scanned file: slots drop the per-instance __dict__
+    # (declared by hand, as dataclass(slots=True) needs Python 3.10)
+    __slots__ = ('path', 'filename', 'directory', 'extension', 'file_type', 'file_size')
     path: str
     filename: str
     directory: str
@@ -28,9 +43,28 @@ class BasicFileInfo:
 # ------------------------------
 # External Variables
 # ------------------------------
-image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.heic', '.heif']
-video_extensions = ['.mp4', '.mov', '.avi', '.wmv', '.mkv', '.flv', '.webm', '.m4v', '.3gp', '.mpg', '.mpeg']
-others_extensions = ['.json', '.xz', '.json.xz', '.txt', '.csv', '.zip', '.rar', '.7z', '.iso', '.dmg']
+image_extensions = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.heic', '.heif'})
+video_extensions = frozenset({'.mp4', '.mov', '.avi', '.wmv', '.mkv', '.flv', '.webm', '.m4v', '.3gp', '.mpg', '.mpeg'})
+others_extensions = frozenset({'.json', '.xz', '.json.xz', '.txt', '.csv', '.zip', '.rar', '.7z', '.iso', '.dmg'})
+
+_SEP_DOT = os.sep + '.'  # Markers of a path that abspath would still normalize ("/./", "/../", "//")
+_SEP_SEP = os.sep * 2
+
+# Extension (without the dot, lowercase) -> file type. Compound suffixes such as
+# .json.xz resolve through their final component ('xz' -> 'other').
+EXT_TYPE = {e.lstrip('.'): 'other' for e in others_extensions}
+EXT_TYPE.update({e.lstrip('.'): 'video' for e in video_extensions})
+EXT_TYPE.update({e.lstrip('.'): 'image' for e in image_extensions})
+
+# Records buffered by scan_and_load before one batched insert
+SCAN_INSERT_BATCH = 500
+# Files whose BLAKE3s are checked against the table with one IN (...) query
+SCAN_EXISTS_BATCH = 100
+# Files hashed ahead of the (priority-ordered) processing loop, and the threads doing it
+HASH_PREFETCH_WINDOW = 32
+HASH_PREFETCH_WORKERS = min(8, os.cpu_count() or 1)
+# Worker processes for perceptual hashes (CPU-bound, GIL-held); 1 keeps them in-process
+IMAGE_HASH_PROCESSES = os.cpu_count() or 1
 
 # You mentioned these patterns in scanner.py, but we can store them here so that
 # they are automatically used for the entire scanning logic in one place.
@@ -52,24 +86,41 @@ class Scanner:
     Scans directories for image/video files, computes hashes, runs YOLO, and inserts
     metadata into a SQL database. Also provides a pre-scan summary of media counts.
     """
+
+    # Common log prefix; per-file messages use lazy %-style args on top of it
+    _PFX = "[bright_black][scanner]📸[/bright_black]"
+
     def __init__(
         self, 
         logger, 
         hash_calculator: HashCalculator, 
         yolo_provider: YoloProvider, 
         video_fingerprinter: VideoFingerprinter,
-        stop_flag_ref: Callable[[], bool] = None
+        stop_flag_ref: Callable[[], bool] = None,
+        hash_cache: Optional[FileHashCache] = None,
+        image_hash_processes: int = IMAGE_HASH_PROCESSES
     ):
         self.logger = logger
         self.hash_calculator = hash_calculator
         self.yolo_provider = yolo_provider
         self.video_fingerprinter = video_fingerprinter
         self.stop_flag_ref = stop_flag_ref
+        # (path, size, mtime) -> BLAKE3 cache, so unchanged files aren't re-read on re-scans
+        self.hash_cache = hash_cache
+        # Perceptual hashes of each chunk's new images run on this many processes (started lazily)
+        self.image_hash_processes = image_hash_processes
+        self._image_hash_pool: Optional[ProcessPoolExecutor] = None
 
     ##############################################################################################################################
     # Public Methods
     ##############################################################################################################################
 
+    def close(self) -> None:
+        """Shut down the image-hash worker processes, if any were started."""
+        if self._image_hash_pool is not None:
+            self._image_hash_pool.shutdown()
+            self._image_hash_pool = None
+
     def reset_table(self, table_name: str, db_connection: DatabaseConnection, db_manager: DatabaseManager) -> None:
         """
         Drop and recreate the table indicated by `table_name`.
@@ -111,7 +162,7 @@ class Scanner:
             try:
                 result = self.scan_and_load(table_name, db_connection, db_manager, directory)
                 processed_dirs += 1
-                self.logger.info(f"[bright_black][scanner]📸[/bright_black] Processed directory {processed_dirs}/{total_dirs}: {directory}")
+                self.logger.info("%s Processed directory %d/%d: %s", self._PFX, processed_dirs, total_dirs, directory)
             except Exception as e:
                 self.logger.error(f"[bright_black][scanner]📸[/bright_black] Error processing directory {directory}: {e}")
                 continue
@@ -154,7 +205,10 @@ class Scanner:
                 image_count = 0
 
                 for filename in files:
-                    ext = os.path.splitext(filename)[1].lower()
+                    _, dot, ext = filename.rpartition('.')
+                    if not dot:
+                        continue
+                    ext = '.' + ext.lower()
                     if ext in video_extensions:
                         video_count += 1
                     elif ext in image_extensions:
@@ -228,11 +282,15 @@ class Scanner:
         processed_count = 0
         skipped_count = 0
         error_count = 0
+        # Resolve the level checks once rather than formatting per-file messages that get dropped
+        log_debug = self.logger.isEnabledFor(logging.DEBUG)
+        log_info = self.logger.isEnabledFor(logging.INFO)
         
         self.logger.info(f"[bright_black][scanner]📸[/bright_black] Scanning directory for files: {base_directory}")
         
-        # First collect all eligible files
-        all_files = []
+        # First collect all eligible files straight into per-priority buckets (index = priority);
+        # there are only five priorities, so chaining the buckets replaces an O(N log N) sort
+        buckets = [[] for _ in range(6)]
         try:
             for root, dirs, files in os.walk(base_directory):
                 # Check stop flag during directory traversal
@@ -247,18 +305,17 @@ class Scanner:
                 
                 for filename in files:
                     file_path = os.path.join(root, filename)
-                    file_info = self._extract_file_components(file_path)
+                    # Classify by name only; the stat in _extract_file_components is left to kept files
+                    file_type = self._file_type_of(filename)
                     
                     # Skip non-media files
-                    if file_info.file_type not in ['image', 'video']:
+                    if file_type not in ('image', 'video'):
                         skipped_count += 1
-                        self.logger.debug(
-                            f"[bright_black][scanner]📸[/bright_black] "
-                            f"Skipping non-media file: {file_path} (type={file_info.file_type})"
-                        )
+                        if log_debug:
+                            self.logger.debug("%s Skipping non-media file: %s (type=%s)", self._PFX, file_path, file_type)
                         continue
                     
-                    all_files.append((file_path, filename))
+                    buckets[self._get_file_priority(filename)].append(file_path)
         except Exception as e:
             self.logger.critical(
                 f"[bright_black][scanner]📸[/bright_black] "
@@ -266,42 +323,73 @@ class Scanner:
             )
             return 0
         
-        # Sort files by priority
-        self.logger.info(f"[bright_black][scanner]📸[/bright_black] Sorting {len(all_files)} files by priority pattern...")
-        sorted_files = sorted(all_files, key=lambda x: self._get_file_priority(x[1]))
+        total_files = sum(len(bucket) for bucket in buckets)
+        self.logger.info(f"[bright_black][scanner]📸[/bright_black] Processing {total_files} files in priority order...")
         
-        # Process files in priority order
-        for idx, (file_path, _) in enumerate(sorted_files, 1):
-            # Check global stop_flag each iteration
-            if self.stop_flag_ref and self.stop_flag_ref():
-                self.logger.info("[bright_black][scanner]📸[/bright_black] Stop flag is set. Stopping file processing.")
-                break
-
-            file_count += 1
-            priority = self._get_file_priority(os.path.basename(file_path))
-            self.logger.info(f"[bright_black][scanner]📸[/bright_black][#FFA500]🔄 Processing file {file_count}/{len(sorted_files)} (Priority {priority}): {file_path}[/#FFA500]")
-            
-            try:
-                # Insert the media file
-                self._insert_media(table_name, db_connection, db_manager, file_path)
-                processed_count += 1
-                # A small delay to prevent hammering the DB too hard
-                time.sleep(0.1)
-
-            except Exception as e:
-                error_count += 1
-                self.logger.error(
-                    f"[bright_black][scanner]📸[/bright_black] "
-                    f"Database insert error for {file_path}: {e}\n{traceback.format_exc()}"
-                )
-                continue
-            
-            # Progress log every 100 files
-            if file_count % 100 == 0:
-                self.logger.info(
-                    f"[bright_black][scanner]📸[/bright_black] "
-                    f"Progress: {file_count}/{len(sorted_files)} files processed, {processed_count} successful, {error_count} errors"
-                )
+        # Process files in priority order; new records are buffered and inserted SCAN_INSERT_BATCH at a time
+        pending_records = []
+        pending_blake3 = set()
+        try:
+            hashed_files = self._prefetch_file_hashes(itertools.chain.from_iterable(buckets))
+            # Each file's priority is its bucket index; don't run the patterns a second time
+            priorities = itertools.chain.from_iterable(itertools.repeat(p, len(bucket)) for p, bucket in enumerate(buckets))
+            items = zip(priorities, hashed_files)
+            stopped = False
+            while not stopped:
+                # One existence query per SCAN_EXISTS_BATCH files instead of one per file
+                chunk = list(itertools.islice(items, SCAN_EXISTS_BATCH))
+                if not chunk:
+                    break
+                existing = self._existing_blake3(table_name, db_connection, db_manager, [file_hashes for _, (_, file_hashes) in chunk])
+                image_hashes = self._calculate_image_hashes([
+                    file_path for _, (file_path, file_hashes) in chunk
+                    if existing is not None and isinstance(file_hashes, FileHashes) and file_hashes.blake3
+                    and file_hashes.blake3 not in existing and self._file_type_of(file_path) == 'image'
+                ])
+
+                for priority, (file_path, file_hashes) in chunk:
+                    # Check global stop_flag each iteration
+                    if self.stop_flag_ref and self.stop_flag_ref():
+                        self.logger.info("[bright_black][scanner]📸[/bright_black] Stop flag is set. Stopping file processing.")
+                        stopped = True
+                        break
+
+                    file_count += 1
+                    if log_info:
+                        self.logger.info("%s[#FFA500]🔄 Processing file %d/%d (Priority %d): %s[/#FFA500]", self._PFX, file_count, total_files, priority, file_path)
+                    
+                    try:
+                        # Build the record for the media file (None if it is skipped)
+                        record = self._build_media_record(table_name, db_connection, db_manager, file_path, file_hashes, existing, image_hashes.get(file_path))
+                        processed_count += 1
+                        if record is not None and record['blake3'] not in pending_blake3:
+                            pending_blake3.add(record['blake3'])
+                            pending_records.append(record)
+                            if len(pending_records) >= SCAN_INSERT_BATCH:
+                                self._flush_records(table_name, db_connection, db_manager, pending_records)
+                                # Flushed rows are in the table now, which this chunk's lookup predates
+                                if existing is not None:
+                                    existing |= pending_blake3
+                                pending_blake3.clear()
+
+                    except Exception as e:
+                        error_count += 1
+                        self.logger.error(
+                            f"[bright_black][scanner]📸[/bright_black] "
+                            f"Database insert error for {file_path}: {e}\n{traceback.format_exc()}"
+                        )
+                        continue
+                    
+                    # Progress log every 100 files
+                    if file_count % 100 == 0:
+                        self.logger.info(
+                            f"[bright_black][scanner]📸[/bright_black] "
+                            f"Progress: {file_count}/{total_files} files processed, {processed_count} successful, {error_count} errors"
+                        )
+        finally:
+            hashed_files.close()
+            # Flush the final partial batch (also on stop or error)
+            self._flush_records(table_name, db_connection, db_manager, pending_records)
 
         self.logger.info(
             f"[bright_black][scanner]📸[/bright_black] Processing completed. "
@@ -314,15 +402,137 @@ class Scanner:
     # Private Methods
     ##############################################################################################################################
 
-    def _insert_media(
+    def _prefetch_file_hashes(self, file_paths: Iterable[str]) -> Iterator[Tuple[str, Union[FileHashes, Exception]]]:
+        """
+        Yield (file_path, file_hashes) in the given order while up to HASH_PREFETCH_WINDOW files ahead
+        are hashed on a thread pool (hashlib releases the GIL). A failed file yields its exception.
+        Only the BLAKE3 is computed (see _build_media_record); unchanged files found in the hash
+        cache are not read at all.
+        The cache is only touched from this (the consuming) thread, as sqlite requires; a cache
+        error (e.g. "database is locked") is logged and the file is simply hashed.
+        Closing the generator early waits only for the hashes already in flight.
+        """
+        def _hash(file_path: str) -> Union[FileHashes, Exception]:
+            try:
+                return self.hash_calculator.calculate_file_hash(file_path, which=("blake3",))
+            except Exception as e:
+                return e
+
+        def _submit(file_path: str) -> Tuple[str, Optional[os.stat_result], Union[Future, FileHashes, Exception]]:
+            if self.hash_cache is None:
+                return file_path, None, executor.submit(_hash, file_path)
+            try:
+                st = os.stat(file_path)
+            except OSError as e:
+                return file_path, None, e
+            try:
+                blake3 = self.hash_cache.get(file_path, st.st_size, st.st_mtime_ns)
+            except sqlite3.Error as e:
+                # The cache is only an optimisation: hash the file and don't try to store it
+                self.logger.warning("%s[yellow] Hash cache lookup failed for %s[/yellow]: %s", self._PFX, file_path, e)
+                return file_path, None, executor.submit(_hash, file_path)
+            if blake3 is not None:
+                return file_path, None, FileHashes(md5=None, sha256=None, sha512=None, blake3=blake3)
+            return file_path, st, executor.submit(_hash, file_path)
+
+        with ThreadPoolExecutor(max_workers=HASH_PREFETCH_WORKERS) as executor:
+            in_flight = collections.deque()
+            paths = iter(file_paths)
+            for file_path in itertools.islice(paths, HASH_PREFETCH_WINDOW):
+                in_flight.append(_submit(file_path))
+            while in_flight:
+                file_path, st, pending = in_flight.popleft()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    in_flight.append(_submit(next_path))
+                file_hashes = pending.result() if isinstance(pending, Future) else pending
+                if st is not None and isinstance(file_hashes, FileHashes) and file_hashes.blake3:
+                    try:
+                        self.hash_cache.put(file_path, st.st_size, st.st_mtime_ns, file_hashes.blake3)
+                    except sqlite3.Error as e:
+                        self.logger.warning("%s[yellow] Hash cache update failed for %s[/yellow]: %s", self._PFX, file_path, e)
+                yield file_path, file_hashes
+
+    def _existing_blake3(
+        self,
+        table_name: str,
+        db_connection: DatabaseConnection,
+        db_manager: DatabaseManager,
+        hashes: List[Union[FileHashes, Exception]]
+    ) -> Optional[Set[str]]:
+        """
+        Return the BLAKE3s among the prefetched hashes that are already in the table, using one
+        IN (...) query. Returns None if the query fails, so each file is checked on its own instead.
+        """
+        blake3_values = [file_hashes.blake3 for file_hashes in hashes if isinstance(file_hashes, FileHashes) and file_hashes.blake3]
+        if not blake3_values:
+            return set()
+        try:
+            return db_manager.existing_blake3(db_connection.connection, table_name, blake3_values)
+        except Exception as e:
+            self.logger.warning(f"[bright_black][scanner]📸[/bright_black] Batched existence check failed, checking files one by one: {e}")
+            return None
+
+    def _calculate_image_hashes(self, file_paths: List[str]) -> Dict[str, Union[ImageHashes, Exception]]:
+        """
+        Perceptual hashes for several images on the worker process pool (imagehash holds the GIL).
+        Returns path -> ImageHashes, or the exception raised for that image. A single image is
+        left to _build_media_record, which hashes it in-process.
+        """
+        if len(file_paths) < 2 or self.image_hash_processes < 2:
+            return {}
+        if self._image_hash_pool is None:
+            # spawn, not fork: the prefetch threads may hold locks that a forked child would inherit locked
+            self._image_hash_pool = ProcessPoolExecutor(
+                max_workers=self.image_hash_processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_hash_worker
+            )
+
+        results = {}
+        futures = {self._image_hash_pool.submit(calculate_image_hash_worker, file_path): file_path for file_path in file_paths}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                results[futures[future]] = e
+        return results
+
+    def _flush_records(
         self,
         table_name: str,
         db_connection: DatabaseConnection,
         db_manager: DatabaseManager,
-        downloaded_file_path: str
+        records: List[dict]
     ) -> None:
         """
-        Insert metadata for a single file into the DB, computing all hashes/YOLO/fingerprints as needed.
+        Insert the buffered records with one executemany round-trip and clear the buffer.
+        """
+        if not records:
+            return
+        inserted = db_manager.insert_many(db_connection.connection, table_name, records)
+        self.logger.info(
+            f"[bright_black][scanner]📸[/bright_black][bold #FFA500]"
+            f"🎯 {inserted}/{len(records)} records inserted successfully into {table_name}.[/bold #FFA500]"
+        )
+        records.clear()
+
+    def _build_media_record(
+        self,
+        table_name: str,
+        db_connection: DatabaseConnection,
+        db_manager: DatabaseManager,
+        downloaded_file_path: str,
+        file_hashes: Optional[Union[FileHashes, Exception]] = None,
+        existing: Optional[Set[str]] = None,
+        image_hashes: Optional[Union[ImageHashes, Exception]] = None
+    ) -> Optional[dict]:
+        """
+        Compute all hashes/YOLO/fingerprints for a single file and return its DB record,
+        or None if the file is skipped (not media, no BLAKE3, already in the DB, or failed).
+        file_hashes may carry the result from _prefetch_file_hashes, and existing the BLAKE3s
+        already known to be in the table (from _existing_blake3); without it the DB is asked.
+        image_hashes may carry the result from _calculate_image_hashes.
         """
         file_info = self._extract_file_components(downloaded_file_path)
         file_path = file_info.path
@@ -334,21 +544,31 @@ class Scanner:
 
         # 1) Skip early if it's not image or video
         if file_type not in ['image', 'video']:
-            self.logger.debug(f"[bright_black][scanner]📸[/bright_black]⏭️ Skipping non-media file: {file_path} (type={file_type})")
-            return
+            self.logger.debug("%s⏭️ Skipping non-media file: %s (type=%s)", self._PFX, file_path, file_type)
+            return None
 
         try:
             # 2) Compute only file-level BLAKE3 first
-            file_hashes = self.hash_calculator.calculate_file_hash(file_path)
+            if file_hashes is None:
+                file_hashes = self.hash_calculator.calculate_file_hash(file_path, which=("blake3",))
+            elif isinstance(file_hashes, Exception):
+                raise file_hashes
             blake3 = file_hashes.blake3  # We'll use this to check DB
             if not blake3:
                 self.logger.warning(f"[bright_black][scanner]📸[/bright_black][yellow]⏭️ Skipping (missing blake3)[/yellow]: {file_path}.")
-                return
+                return None
 
             # 3) Check if this BLAKE3 already exists in DB
-            if db_manager.exists_by_blake3(db_connection.connection, table_name, blake3):
-                self.logger.info(f"[bright_black][scanner]📸[/bright_black][yellow]⏭️ Skipping (exists)[/yellow]: {file_path}")
-                return
+            if existing is not None:
+                exists = blake3 in existing
+            else:
+                exists = db_manager.exists_by_blake3(db_connection.connection, table_name, blake3)
+            if exists:
+                self.logger.info("%s[yellow]⏭️ Skipping (exists)[/yellow]: %s", self._PFX, file_path)
+                return None
+
+            # The legacy digests are only stored for reference, so they're left until the file is known to be new
+            file_hashes = self.hash_calculator.calculate_file_hash(file_path, which=LEGACY_HASH_ALGORITHMS)
 
             # 4) Not in DB → compute other hashes or YOLO if needed
             md5 = file_hashes.md5
@@ -367,7 +587,10 @@ class Scanner:
 
             # 5) If it’s an image → do image hashing & YOLO
             if file_type == 'image':
-                image_hashes = self.hash_calculator.calculate_image_hash(file_path)
+                if image_hashes is None:
+                    image_hashes = self.hash_calculator.calculate_image_hash(file_path)
+                elif isinstance(image_hashes, Exception):
+                    raise image_hashes
                 dhash = image_hashes.dhash
                 phash = image_hashes.phash
                 whash = image_hashes.whash
@@ -389,10 +612,8 @@ class Scanner:
                 video_fps = vid_fp.fps
                 video_resolution = vid_fp.resolution
 
-            # 7) Insert into DB
-            db_manager.insert(
-                connection=db_connection.connection,
-                table_name=table_name,
+            # 7) Record for the batched insert
+            return dict(
                 file_path=file_path,
                 file_size=file_size,
                 file_directory=file_directory,
@@ -419,42 +640,53 @@ class Scanner:
                 video_resolution=video_resolution
             )
 
-            self.logger.info(
-                f"[bright_black][scanner]📸[/bright_black][bold #FFA500]"
-                f"🎯 Record inserted successfully: {file_path} into {table_name}.[/bold #FFA500]"
-            )
-
         except Exception as e:
             self.logger.error(
                 f"[bright_black][scanner]📸[/bright_black][bold red]"
                 f"🔄 Failed to process file {file_path}[/bold red]: {e}\n\t{traceback.format_exc()}"
             )
+            return None
+
+    @staticmethod
+    def _abs_path(path: str) -> str:
+        """os.path.abspath, skipped for paths that are already absolute and normalized (the common case)."""
+        if os.path.isabs(path) and _SEP_DOT not in path and _SEP_SEP not in path:
+            return path
+        return os.path.abspath(path)
+
+    @staticmethod
+    def _extension_of(filename: str) -> str:
+        """Extension of filename without the dot; like splitext, '' for "name" or dot-files like ".profile"."""
+        stem, _, extension = filename.rpartition('.')
+        return extension if stem.strip('.') else ''
+
+    @classmethod
+    def _file_type_of(cls, filename: str) -> str:
+        """
+        Classify a file as 'image', 'video', 'other' or 'unknown' by its name alone (no stat).
+        """
+        return EXT_TYPE.get(cls._extension_of(filename).lower(), 'unknown')
 
     def _extract_file_components(self, file_path: str) -> BasicFileInfo:
         """
         Extract file path components into BasicFileInfo.
         Determines whether it's an image, video, other, or unknown.
         """
-        abs_path = os.path.abspath(file_path)
-        directory_path = os.path.dirname(abs_path)
-        filename = os.path.basename(abs_path)
-        basename, extension = os.path.splitext(filename)
-        extension = extension[1:] if extension.startswith('.') else extension
-        file_size = os.path.getsize(abs_path) if os.path.exists(abs_path) else 0
-
-        if abs_path.lower().endswith(tuple(image_extensions)):
-            file_type = 'image'
-        elif abs_path.lower().endswith(tuple(video_extensions)):
-            file_type = 'video'
-        elif abs_path.lower().endswith(tuple(others_extensions)):
-            file_type = 'other'
-        else:
-            file_type = 'unknown'
+        abs_path = self._abs_path(file_path)
+        # One stat (instead of exists + getsize) and one pass over the separators
+        # instead of dirname/basename/splitext/basename
+        try:
+            file_size = os.stat(abs_path).st_size
+        except OSError:
+            file_size = 0
+        directory_path, _, filename = abs_path.rpartition(os.sep)
+        extension = self._extension_of(filename)
+        file_type = EXT_TYPE.get(extension.lower(), 'unknown')
         
         return BasicFileInfo(
             path=abs_path,
             filename=filename,
-            directory=os.path.basename(directory_path),
+            directory=directory_path.rpartition(os.sep)[2],
             extension=extension,
             file_type=file_type,
             file_size=file_size
@@ -8,6 +8,7 @@ import numpy as np
 import torch
 from decimal import Decimal
 from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 from dataclasses import dataclass
 from io import StringIO
@@ -20,6 +21,9 @@ os.environ['ULTRALYTICS_DISABLE_PRINT'] = 'True'
 warnings.filterwarnings('ignore', category=UserWarning)
 warnings.filterwarnings('ignore', category=RuntimeWarning)
 
+YOLO_BATCH_SIZE = 16  # Images per inference call in has_human_batch
+YOLO_LOADER_THREADS = 4  # Threads decoding the next batch while the current one is on the model
+
 @dataclass
 class YoloResult:
     has_human: bool
@@ -34,7 +38,8 @@ def get_yolo_provider(use_remote=False, remote_url=None, max_retries=3, retry_de
         "model_path": "model/yolov8x.pt",
         "iou": 0.5,
         "conf": 0.5,
-        "device": "auto"
+        "device": "auto",
+        "precision": "auto"
     }
     
     # Override with any provided parameters
@@ -66,9 +71,12 @@ class YoloProvider:
                  model_path: str, 
                  iou: float = 0.5, 
                  conf: float = 0.5, 
-                 device: str = "auto"):
+                 device: str = "auto",
+                 precision: str = "auto"):
         """
         Initialize the YOLO model with minimal output.
+        :param model_path: .pt weights, or a model exported with export_quantized (ONNX/OpenVINO/TensorRT)
+        :param precision: "fp16", "fp32" or "auto" (FP16 on CUDA, FP32 on CPU)
         """
         # Redirect stdout and stderr to devnull to suppress all prints
         self.devnull = open(os.devnull, 'w')
@@ -91,6 +99,7 @@ class YoloProvider:
             self.devnull.close()
 
             self.device = self._select_device(device)
+            self.half = self._select_half(precision, self.device)
         except Exception as e:
             # Restore stdout and stderr in case of error
             sys.stdout = sys.__stdout__
@@ -118,31 +127,67 @@ class YoloProvider:
 
         return selected_device
 
+    @staticmethod
+    def _select_half(precision: str, device: str) -> bool:
+        """
+        Decide whether to run inference in FP16. Half precision is only used on CUDA.
+        """
+        precision = precision.lower()
+        if precision not in ("auto", "fp16", "fp32"):
+            raise ValueError(f"Unknown YOLO precision: {precision} (expected auto, fp16 or fp32)")
+        return precision != "fp32" and device.startswith("cuda")
+
+    @staticmethod
+    def export_quantized(model_path: str, format: str = "onnx", int8: bool = False, half: bool = False, data: Optional[str] = None) -> str:
+        """
+        One-time export of YOLO weights to a reduced-precision model that YoloProvider can load.
+        :param format: ultralytics export format ("onnx", "openvino", "engine", ...)
+        :param int8: post-training INT8 quantization (needs calibration data for most formats)
+        :param half: FP16 weights
+        :param data: dataset yaml used for INT8 calibration
+        :return: path of the exported model
+        """
+        model = YOLO(model_path, verbose=False)
+        export_args = dict(format=format, int8=int8, half=half)
+        if data:
+            export_args["data"] = data
+        return model.export(**export_args)
+
+    def _prepare_image(self, image: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Validate an image array and normalize it to 3-channel uint8. Returns None if unusable.
+        """
+        # Additional image preprocessing and validation
+        if image is None:
+            self.logger.error("[bright_black][Yolo]📸[/bright_black] Received None image")
+            return None
+
+        # Ensure the image has the correct number of channels
+        if len(image.shape) < 3:
+            # Convert grayscale to RGB
+            image = np.stack((image,)*3, axis=-1)
+        elif image.shape[2] > 3:
+            # Truncate to first 3 channels if more exist
+            image = image[:,:,:3]
+
+        # Ensure the image is in uint8 format
+        if image.dtype != np.uint8:
+            image = (image * 255).astype(np.uint8)
+
+        # Validate image dimensions
+        if image.shape[0] == 0 or image.shape[1] == 0:
+            self.logger.error("[bright_black][Yolo]📸[/bright_black] Image has zero dimensions")
+            return None
+
+        return image
+
     def _predict(self, image: np.ndarray) -> List[dict]:
         """
         Perform object detection on a given image with suppressed output.
         """
         try:
-            # Additional image preprocessing and validation
+            image = self._prepare_image(image)
             if image is None:
-                self.logger.error("[bright_black][Yolo]📸[/bright_black] Received None image")
-                return []
-
-            # Ensure the image has the correct number of channels
-            if len(image.shape) < 3:
-                # Convert grayscale to RGB
-                image = np.stack((image,)*3, axis=-1)
-            elif image.shape[2] > 3:
-                # Truncate to first 3 channels if more exist
-                image = image[:,:,:3]
-
-            # Ensure the image is in uint8 format
-            if image.dtype != np.uint8:
-                image = (image * 255).astype(np.uint8)
-
-            # Validate image dimensions
-            if image.shape[0] == 0 or image.shape[1] == 0:
-                self.logger.error("[bright_black][Yolo]📸[/bright_black] Image has zero dimensions")
                 return []
 
             # Redirect stdout and stderr to devnull
@@ -156,6 +201,7 @@ class YoloProvider:
                     image, 
                     device=self.device, 
                     verbose=False,
+                    half=self.half,
                     stream=False
                 )
                 
@@ -179,6 +225,107 @@ class YoloProvider:
             )
             return []
 
+    def _predict_batch(self, images: List[np.ndarray]) -> list:
+        """
+        Perform object detection on several prepared images in one inference call.
+        Returns one result per image (in order), or an empty list on failure.
+        """
+        devnull = open(os.devnull, 'w')
+        sys.stdout = devnull
+        sys.stderr = devnull
+        try:
+            start_time = time.time()
+            results = self.model.predict(
+                images,
+                device=self.device,
+                verbose=False,
+                half=self.half,
+                stream=False
+            )
+            self.logger.debug(
+                f"[bright_black][Yolo]📸[/bright_black] "
+                f"Batch prediction of {len(images)} images completed in {time.time() - start_time:.4f} seconds"
+            )
+            return results
+        except Exception as e:
+            self.logger.error(f"[bright_black][Yolo]📸[/bright_black] Batch prediction failed: {e}")
+            return []
+        finally:
+            # Restore stdout and stderr
+            sys.stdout = sys.__stdout__
+            sys.stderr = sys.__stderr__
+            devnull.close()
+
+    @staticmethod
+    def _to_yolo_result(results) -> YoloResult:
+        """
+        Reduce prediction results for one image to a YoloResult (person count and best confidence).
+        """
+        max_conf = Decimal('0.0')
+        has_human = False
+        human_count = 0
+        
+        for result in results:
+            boxes = result.boxes
+            for box in boxes:
+                cls_id = int(box.cls[0]) if hasattr(box.cls, '__getitem__') else int(box.cls)
+                cls_name = result.names[cls_id]
+                conf_val = float(box.conf[0]) if hasattr(box.conf, '__getitem__') else float(box.conf)
+                conf = Decimal(str(round(conf_val, 4)))
+                
+                if cls_name == "person":
+                    has_human = True
+                    if conf > max_conf:
+                        max_conf = conf
+                    human_count += 1
+        
+        return YoloResult(has_human, max_conf, human_count)
+
+    def _load_image(self, filepath: str) -> Optional[np.ndarray]:
+        """
+        Load, validate and prepare an image for inference. Returns None (and logs) on failure.
+        """
+        try:
+            image = Image.open(filepath)
+            image.verify()
+            image = Image.open(filepath)
+            return self._prepare_image(np.array(image))
+        except Exception as e:
+            self.logger.error(
+                f"[bright_black][Yolo]📸[/bright_black][bold red] "
+                f"Error processing image from {filepath}:[/bold red] {e}"
+            )
+            return None
+
+    def has_human_batch(self, filepaths: List[str], batch_size: int = YOLO_BATCH_SIZE) -> List[YoloResult]:
+        """
+        Detect humans in several images, batch_size images per inference call.
+        The next batch is decoded on a thread pool while the current one runs on the model.
+        Results are returned in the order of filepaths; unreadable images get a negative result.
+        """
+        results = [YoloResult(False, Decimal('0.0'), 0) for _ in filepaths]
+        chunks = [list(range(start, min(start + batch_size, len(filepaths))))
+                  for start in range(0, len(filepaths), batch_size)]
+        if not chunks:
+            return results
+
+        with ThreadPoolExecutor(max_workers=YOLO_LOADER_THREADS) as executor:
+            pending = executor.map(self._load_image, [filepaths[i] for i in chunks[0]])
+            for n, chunk in enumerate(chunks):
+                images = list(pending)
+                if n + 1 < len(chunks):
+                    # Prefetch the next batch while this one is on the model
+                    pending = executor.map(self._load_image, [filepaths[i] for i in chunks[n + 1]])
+
+                loaded = [(i, image) for i, image in zip(chunk, images) if image is not None]
+                if not loaded:
+                    continue
+                predictions = self._predict_batch([image for _, image in loaded])
+                for (i, _), prediction in zip(loaded, predictions):
+                    results[i] = self._to_yolo_result([prediction])
+
+        return results
+
     def has_human(self, filepath: str) -> YoloResult:
         """
         Detect if an image contains humans.
@@ -200,25 +347,7 @@ class YoloProvider:
             results = self._predict(image_data)
             
             # Process results
-            max_conf = Decimal('0.0')
-            has_human = False
-            human_count = 0
-            
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    cls_id = int(box.cls[0]) if hasattr(box.cls, '__getitem__') else int(box.cls)
-                    cls_name = result.names[cls_id]
-                    conf_val = float(box.conf[0]) if hasattr(box.conf, '__getitem__') else float(box.conf)
-                    conf = Decimal(str(round(conf_val, 4)))
-                    
-                    if cls_name == "person":
-                        has_human = True
-                        if conf > max_conf:
-                            max_conf = conf
-                        human_count += 1
-            
-            return YoloResult(has_human, max_conf, human_count)
+            return self._to_yolo_result(results)
         
         except Exception as e:
             self.logger.error(
@@ -356,6 +485,13 @@ class RemoteYoloProvider:
         self.server_available = False  # Mark server as unavailable to skip retries on future calls
         return self._fallback_has_human(filepath)
     
+    def has_human_batch(self, filepaths: List[str]) -> List[YoloResult]:
+        """
+        Same interface as YoloProvider.has_human_batch. The API takes one image per request,
+        so this calls has_human per file (each call handles its own retries and fallback).
+        """
+        return [self.has_human(filepath) for filepath in filepaths]
+
     def _fallback_has_human(self, filepath: str) -> YoloResult:
         """Use local provider as fallback when remote fails."""
         # Initialize local provider if needed